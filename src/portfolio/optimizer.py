@@ -2,31 +2,102 @@
 Portfolio optimization using Modern Portfolio Theory
 """
 
-import yfinance as yf
 import numpy as np
 import pandas as pd
-import warnings
+import heapq
+import hashlib
 from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Tuple, Any, Optional
 
-# Suppress yfinance warnings
-warnings.filterwarnings('ignore', category=FutureWarning, module='yfinance')
-warnings.filterwarnings('ignore', message='.*auto_adjust.*')
-
 from ..utils.constants import (
     DEFAULT_PERIOD, DEFAULT_INTERVAL, DEFAULT_TARGET_RETURN,
-    DEFAULT_RISK_PER_TRADE, DEFAULT_ATR_MULTIPLIER, EMOJIS
+    DEFAULT_RISK_PER_TRADE, DEFAULT_ATR_MULTIPLIER, FLOAT32_MAX_OBSERVATIONS, EMOJIS
 )
 from ..utils.config import load_config, save_config, format_currency, format_percentage
 from ..utils.helpers import (
-    calculate_atr, calculate_returns, calculate_expected_return,
-    calculate_volatility, portfolio_performance, is_in_cooling_period,
+    calculate_atr_panel, calculate_returns, calculate_expected_return,
+    calculate_volatility, calculate_covariance_matrix, portfolio_performance, is_in_cooling_period,
     format_recommendation, progress_bar
 )
+from ..utils.jit import njit
+from ..utils.market_data import download_market_data
 from .stock_filter import StockFilter
 
+@njit(cache=True, nogil=True)
+def _efficiency(allocation: np.ndarray, prices: np.ndarray, weights: np.ndarray,
+                targets: np.ndarray, idx: int) -> float:
+    """Efficiency of buying one more share: weight significance + proximity to target"""
+    new_investment = allocation[idx] * prices[idx] + prices[idx]
+    weight_importance = weights[idx] * 100  # Higher weight = more important
+    proximity_to_target = 1.0 - abs(new_investment - targets[idx]) / max(targets[idx], 1.0)
+    return weight_importance * proximity_to_target
+
+@njit(cache=True, nogil=True)
+def _greedy_allocation(prices: np.ndarray, weights: np.ndarray, targets: np.ndarray,
+                       total_capital: float, max_iterations: int) -> np.ndarray:
+    """Allocate whole shares toward target investments, then spend leftover capital greedily"""
+    n_stocks = len(prices)
+    allocation = np.zeros(n_stocks, dtype=np.int64)
+    remaining_capital = total_capital
+    
+    # Start with basic allocation (truncated shares)
+    for idx in range(n_stocks):
+        if prices[idx] > 0:
+            allocation[idx] = int(targets[idx] / prices[idx])
+            remaining_capital -= allocation[idx] * prices[idx]
+    
+    # Max-heap of (efficiency, position); ties go to the earlier stock
+    heap = [(0.0, -1)]  # Typed seed entry so Numba can infer the element type
+    heap.pop()
+    for idx in range(n_stocks):
+        if prices[idx] > 0:
+            heap.append((-_efficiency(allocation, prices, weights, targets, idx), idx))
+    heapq.heapify(heap)
+    
+    # Allocate remaining capital one share at a time to the most efficient purchase
+    purchases = 0
+    while len(heap) > 0 and remaining_capital > 0 and purchases < max_iterations:
+        neg_efficiency, idx = heap[0]
+        if prices[idx] > remaining_capital:
+            heapq.heappop(heap)  # Remaining capital only shrinks, so never affordable again
+            continue
+        if neg_efficiency >= 0:
+            break  # No more beneficial purchases possible
+        
+        allocation[idx] += 1
+        remaining_capital -= prices[idx]
+        purchases += 1
+        heapq.heapreplace(heap, (-_efficiency(allocation, prices, weights, targets, idx), idx))
+    
+    return allocation
+
+def _portfolio_variance(weights: np.ndarray, cov_matrix: np.ndarray) -> float:
+    """SLSQP objective: portfolio variance wᵀΣw"""
+    return weights @ cov_matrix @ weights
+
+def _portfolio_variance_grad(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
+    """Gradient of the portfolio variance: 2Σw"""
+    return 2.0 * cov_matrix @ weights
+
+def _weights_sum_constraint(weights: np.ndarray) -> float:
+    """Equality constraint: weights sum to 1"""
+    return weights.sum() - 1.0
+
+def _weights_sum_jacobian(weights: np.ndarray) -> np.ndarray:
+    """Jacobian of the weights-sum constraint"""
+    return np.ones_like(weights)
+
+def _target_return_constraint(weights: np.ndarray, expected_returns: np.ndarray, target_return: float) -> float:
+    """Inequality constraint: portfolio return at least the target"""
+    return weights @ expected_returns - target_return
+
+def _target_return_jacobian(weights: np.ndarray, expected_returns: np.ndarray, target_return: float) -> np.ndarray:
+    """Jacobian of the target-return constraint"""
+    return expected_returns
+
 class InvestmentOptimizer:
     """
     Investment portfolio optimizer using Modern Portfolio Theory
@@ -81,10 +152,16 @@ class InvestmentOptimizer:
         
         # Market data storage
         self.data = None
+        self.price_dates = None
+        self.closes = None  # T×N arrays aligned with self.tickers
+        self.highs = None
+        self.lows = None
         self.current_prices = {}
         self.atr_values = {}
         self.expected_returns = {}
         self.volatilities = {}
+        self.cov_matrix = None
+        self._returns_buffer = None
         
         # Filtering results
         self.filtered_stocks = {}
@@ -95,6 +172,7 @@ class InvestmentOptimizer:
         self.optimal_weights = None
         self.portfolio_return = None
         self.portfolio_volatility = None
+        self._last_metrics_key = None
         self.additional_capital_needed = 0  # Additional capital needed for full utilization
         
         logging.info(f"Optimizer initialized with {len(self.all_tickers)} stocks")
@@ -245,77 +323,44 @@ class InvestmentOptimizer:
             current_time = datetime.now().strftime('%H:%M:%S')
             print(f"\n{EMOJIS['chart']} Fetching market data at {current_time}...")
             
-            # Download data for all tickers with warnings suppressed
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                self.data = yf.download(self.tickers, period=self.period, interval=self.interval, progress=False)
+            # Download data for all tickers (yfinance warnings are filtered at import)
+            self.data = download_market_data(self.tickers, self.period, self.interval)
             
             if self.data.empty:
                 logging.error("No market data retrieved")
                 return False
             
-            # Handle single vs multiple tickers
-            if len(self.tickers) == 1:
-                # For single ticker, create a proper MultiIndex structure
-                ticker = self.tickers[0]
-                if not isinstance(self.data.columns, pd.MultiIndex):
-                    # Create MultiIndex structure for consistency
-                    self.data.columns = pd.MultiIndex.from_tuples(
-                        [(col, ticker) for col in self.data.columns]
-                    )
+            # Single-ticker downloads may come back flat; use the (field, ticker) layout throughout
+            if not isinstance(self.data.columns, pd.MultiIndex):
+                self.data.columns = pd.MultiIndex.from_product([self.data.columns, self.tickers])
+            
+            # Extract aligned T×N price arrays once; column i belongs to self.tickers[i]
+            panels = {field: self.data[field].reindex(columns=self.tickers) for field in ('High', 'Low', 'Close')}
+            self.price_dates = panels['Close'].index
+            self.highs = panels['High'].to_numpy(dtype=np.float64)
+            self.lows = panels['Low'].to_numpy(dtype=np.float64)
+            self.closes = panels['Close'].to_numpy(dtype=np.float64)
+            
+            # Calculate ATR for all tickers in one pass over the price panel
+            latest_atr = calculate_atr_panel(panels['High'], panels['Low'], panels['Close']).iloc[-1].to_numpy()
             
             # Calculate current prices and ATR values
             fresh_data_count = 0
-            for ticker in self.tickers:
-                try:
-                    # Handle both MultiIndex and single-level index
-                    if isinstance(self.data.columns, pd.MultiIndex):
-                        if ('Close', ticker) in self.data.columns:
-                            close_prices = self.data['Close'][ticker].dropna()
-                        else:
-                            logging.warning(f"Close data not found for {ticker}")
-                            continue
-                    else:
-                        # Single ticker case - data might be direct DataFrame
-                        if 'Close' in self.data.columns:
-                            close_prices = self.data['Close'].dropna()
-                        else:
-                            logging.warning(f"Close column not found in data for {ticker}")
-                            continue
-                    
-                    if not close_prices.empty:
-                        self.current_prices[ticker] = float(close_prices.iloc[-1])
-                        fresh_data_count += 1
-                        
-                        # Calculate ATR with proper data structure
-                        if isinstance(self.data.columns, pd.MultiIndex):
-                            ticker_data = pd.DataFrame({
-                                'High': self.data['High'][ticker],
-                                'Low': self.data['Low'][ticker], 
-                                'Close': self.data['Close'][ticker]
-                            })
-                        else:
-                            ticker_data = pd.DataFrame({
-                                'High': self.data['High'],
-                                'Low': self.data['Low'], 
-                                'Close': self.data['Close']
-                            })
-                        
-                        atr = calculate_atr(ticker_data)
-                        self.atr_values[ticker] = float(atr.iloc[-1]) if not atr.empty else 0.0
-                        
-                except Exception as e:
-                    logging.warning(f"Error processing {ticker}: {e}")
-                    self.current_prices[ticker] = 0.0
-                    self.atr_values[ticker] = 0.0
+            for i, ticker in enumerate(self.tickers):
+                close_prices = self.closes[:, i]
+                close_prices = close_prices[~np.isnan(close_prices)]
+                if close_prices.size == 0:
+                    logging.warning(f"Close data not found for {ticker}")
+                    continue
+                
+                self.current_prices[ticker] = float(close_prices[-1])
+                self.atr_values[ticker] = float(latest_atr[i])
+                fresh_data_count += 1
             
             # Show summary of fresh data
             if fresh_data_count > 0:
                 try:
-                    if isinstance(self.data.columns, pd.MultiIndex):
-                        latest_date = self.data['Close'][self.tickers[0]].dropna().index[-1].strftime('%Y-%m-%d')
-                    else:
-                        latest_date = self.data['Close'].dropna().index[-1].strftime('%Y-%m-%d')
+                    latest_date = self.price_dates[~np.isnan(self.closes[:, 0])][-1].strftime('%Y-%m-%d')
                     print(f"   ✅ Fresh data retrieved for {fresh_data_count} stocks (latest: {latest_date})")
                 except:
                     print(f"   ✅ Fresh data retrieved for {fresh_data_count} stocks")
@@ -327,33 +372,27 @@ class InvestmentOptimizer:
             logging.error(f"Error fetching market data: {e}")
             return False
     
+    def _metrics_cache_key(self) -> Tuple[str, Tuple[str, ...], float]:
+        """Key identifying the inputs of the metrics and optimization stages"""
+        prices_hash = hashlib.blake2b(self.closes.tobytes(), digest_size=16).hexdigest()
+        return prices_hash, tuple(self.tickers), self.target_return
+    
     def calculate_portfolio_metrics(self) -> bool:
         """Calculate expected returns and volatilities"""
         try:
-            for ticker in self.tickers:
+            for i, ticker in enumerate(self.tickers):
                 try:
-                    # Handle both MultiIndex and single-level index
-                    if isinstance(self.data.columns, pd.MultiIndex):
-                        if ('Close', ticker) in self.data.columns:
-                            close_data = self.data['Close'][ticker]
-                        else:
-                            logging.warning(f"Close data not found for {ticker}")
-                            self.expected_returns[ticker] = 0.0
-                            self.volatilities[ticker] = 0.1
-                            continue
-                    else:
-                        # Single ticker case
-                        if 'Close' in self.data.columns:
-                            close_data = self.data['Close']
-                        else:
-                            logging.warning(f"Close column not found for {ticker}")
-                            self.expected_returns[ticker] = 0.0
-                            self.volatilities[ticker] = 0.1
-                            continue
+                    close_prices = self.closes[:, i]
+                    close_prices = close_prices[~np.isnan(close_prices)]
+                    if close_prices.size == 0:
+                        logging.warning(f"Close data not found for {ticker}")
+                        self.expected_returns[ticker] = 0.0
+                        self.volatilities[ticker] = 0.1
+                        continue
                     
-                    returns = calculate_returns(pd.DataFrame({'Close': close_data}))
+                    returns = calculate_returns(close_prices)
                     
-                    if not returns.empty:
+                    if returns.size > 0:
                         self.expected_returns[ticker] = calculate_expected_return(returns)
                         self.volatilities[ticker] = calculate_volatility(returns)
                     else:
@@ -365,12 +404,42 @@ class InvestmentOptimizer:
                     self.expected_returns[ticker] = 0.0
                     self.volatilities[ticker] = 0.1
             
+            self.cov_matrix = self._calculate_covariance_matrix()
             return True
             
         except Exception as e:
             logging.error(f"Error calculating portfolio metrics: {e}")
             return False
     
+    def _calculate_covariance_matrix(self) -> np.ndarray:
+        """Calculate annualized sample covariance of daily returns across tickers"""
+        volatilities_array = np.array([self.volatilities[ticker] for ticker in self.tickers])
+        # A single return has no sample deviation; use the same fallback as missing data
+        volatilities_array[~np.isfinite(volatilities_array)] = 0.1
+        
+        if self.closes.shape[0] < 3:
+            return np.diag(volatilities_array ** 2)
+        
+        # Aligned T×N return matrix written into a reused buffer from slicing views;
+        # gaps stay NaN so they drop out of the pairwise estimates
+        returns_shape = (self.closes.shape[0] - 1, self.closes.shape[1])
+        
+        # float32 halves the bytes through the covariance GEMMs. Its ~1e-7 relative
+        # rounding is far below the sampling noise of the estimate (~1/sqrt(T), several
+        # percent for a year of daily data), but error accumulates with T, so long
+        # histories stay in float64.
+        dtype = np.float32 if returns_shape[0] <= FLOAT32_MAX_OBSERVATIONS else np.float64
+        if self._returns_buffer is None or self._returns_buffer.shape != returns_shape \
+                or self._returns_buffer.dtype != dtype:
+            self._returns_buffer = np.empty(returns_shape, dtype=dtype)
+        returns_matrix = self._returns_buffer
+        np.subtract(self.closes[1:], self.closes[:-1], out=returns_matrix)
+        np.divide(returns_matrix, self.closes[:-1], out=returns_matrix)
+        
+        # Scaled by the per-ticker volatilities, so the diagonal agrees with them
+        # even for tickers with a short history
+        return calculate_covariance_matrix(returns_matrix, volatilities_array)
+    
     def optimize_portfolio(self) -> bool:
         """Optimize portfolio using Modern Portfolio Theory"""
         try:
@@ -382,33 +451,43 @@ class InvestmentOptimizer:
             
             # Prepare data for optimization
             returns_array = np.array([self.expected_returns[ticker] for ticker in self.tickers])
-            volatilities_array = np.array([self.volatilities[ticker] for ticker in self.tickers])
-            
-            # Create covariance matrix (simplified)
-            cov_matrix = np.diag(volatilities_array ** 2)
+            cov_matrix = self.cov_matrix
+            if cov_matrix is None:
+                cov_matrix = self.cov_matrix = self._calculate_covariance_matrix()
+            
+            # Fast path: closed-form solution when it respects the weight bounds
+            closed_form_weights = self._solve_closed_form(returns_array, cov_matrix)
+            if closed_form_weights is not None:
+                self.optimal_weights = closed_form_weights
+                self.portfolio_return, self.portfolio_volatility = portfolio_performance(
+                    self.optimal_weights, returns_array, cov_matrix
+                )
+                print(f"{EMOJIS['check']} Optimization complete - Portfolio optimized!")
+                return True
             
             # Initial guess (equal weights)
             n_assets = len(self.tickers)
             initial_weights = np.array([1.0 / n_assets] * n_assets)
             
-            # Constraints
+            # Constraints (with analytic Jacobians to avoid finite-difference probes)
+            target_args = (returns_array, self.target_return)
             constraints = [
-                {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0},  # Weights sum to 1
-                {'type': 'ineq', 'fun': lambda x: np.dot(x, returns_array) - self.target_return}  # Target return
+                {'type': 'eq', 'fun': _weights_sum_constraint,  # Weights sum to 1
+                 'jac': _weights_sum_jacobian},
+                {'type': 'ineq', 'fun': _target_return_constraint,  # Target return
+                 'jac': _target_return_jacobian, 'args': target_args}
             ]
             
             # Bounds (0 to 1 for each weight)
             bounds = tuple((0, 1) for _ in range(n_assets))
             
-            # Objective function (minimize portfolio variance)
-            def objective(weights):
-                return np.dot(weights.T, np.dot(cov_matrix, weights))
-            
-            # Optimize
+            # Optimize (minimize portfolio variance)
             result = minimize(
-                objective,
+                _portfolio_variance,
                 initial_weights,
+                args=(cov_matrix,),
                 method='SLSQP',
+                jac=_portfolio_variance_grad,
                 bounds=bounds,
                 constraints=constraints
             )
@@ -428,51 +507,82 @@ class InvestmentOptimizer:
             logging.error(f"Error in portfolio optimization: {e}")
             return False
     
+    def _solve_closed_form(self, returns_array: np.ndarray, cov_matrix: np.ndarray) -> Optional[np.ndarray]:
+        """Solve the mean-variance problem analytically, ignoring the 0-1 weight bounds
+        
+        Returns the weights if they fall within bounds, otherwise None so the
+        caller can fall back to SLSQP.
+        """
+        # Covariance is symmetric positive definite: solve via Cholesky, never form the inverse
+        try:
+            ones = np.ones(len(returns_array))
+            cho = cho_factor(cov_matrix, lower=True)
+            inv_cov_ones = cho_solve(cho, ones)
+            inv_cov_mu = cho_solve(cho, returns_array)
+        except np.linalg.LinAlgError:
+            return None
+        
+        a = ones @ inv_cov_ones
+        b = ones @ inv_cov_mu
+        c = returns_array @ inv_cov_mu
+        
+        # Global minimum-variance portfolio satisfies the target on its own
+        weights = inv_cov_ones / a
+        if weights @ returns_array < self.target_return:
+            # Target-return constraint is binding: solve [[A, B], [B, C]] [λ, γ] = [1, r*]
+            det = a * c - b * b
+            if abs(det) < 1e-12:
+                return None
+            lam = (c - b * self.target_return) / det
+            gamma = (a * self.target_return - b) / det
+            weights = lam * inv_cov_ones + gamma * inv_cov_mu
+        
+        tolerance = 1e-10
+        if not np.all(np.isfinite(weights)) or np.any(weights < -tolerance) or np.any(weights > 1 + tolerance):
+            return None
+        return np.clip(weights, 0.0, 1.0)
+    
     def get_trading_recommendations(self) -> Dict[str, Dict[str, Any]]:
         """Get trading recommendations based on optimization with improved capital utilization"""
         recommendations = {}
         total_capital = self.config['cash']
         
-        # First pass: collect available stocks and their optimal allocations
-        available_stocks = []
+        # First pass: collect stocks outside their cooling period
+        today = datetime.now().date()
+        tickers = []
+        positions = []
         for i, ticker in enumerate(self.tickers):
-            current_holdings = self.config['stocks'][ticker]
-            current_price = self.current_prices.get(ticker, 0)
-            optimal_weight = self.optimal_weights[i] if self.optimal_weights is not None else 0
-            
             # Check cooling period
-            if is_in_cooling_period(current_holdings['last_sold']):
+            if is_in_cooling_period(self.config['stocks'][ticker]['last_sold'], today=today):
                 recommendations[ticker] = {
                     'action': 'NO_ACTION_COOLING',
-                    'current_price': current_price,
+                    'current_price': self.current_prices.get(ticker, 0),
                     'details': {}
                 }
                 continue
             
-            available_stocks.append({
-                'ticker': ticker,
-                'price': current_price,
-                'optimal_weight': optimal_weight,
-                'current_shares': current_holdings['shares'],
-                'target_investment': total_capital * optimal_weight
-            })
+            tickers.append(ticker)
+            positions.append(i)
+        
+        # Struct-of-arrays view of the available stocks, indexed by position
+        prices = np.array([self.current_prices.get(ticker, 0) for ticker in tickers], dtype=np.float64)
+        current_shares = np.array([self.config['stocks'][ticker]['shares'] for ticker in tickers], dtype=np.int64)
+        if self.optimal_weights is not None:
+            weights = np.asarray(self.optimal_weights, dtype=np.float64)[positions]
+        else:
+            weights = np.zeros(len(tickers))
         
         # Improved allocation: maximize capital utilization
-        allocated_shares = self._optimize_share_allocation(available_stocks, total_capital)
+        target_shares = self._optimize_share_allocation(prices, weights, total_capital)
         
         # Generate recommendations based on optimized allocation
-        for stock_info in available_stocks:
-            ticker = stock_info['ticker']
-            current_price = stock_info['price']
-            optimal_weight = stock_info['optimal_weight']
-            current_shares = stock_info['current_shares']
-            target_shares = allocated_shares.get(ticker, 0)
+        for idx, ticker in enumerate(tickers):
+            current_price = float(prices[idx])
             
             # Determine action
-            if target_shares > current_shares:
+            if target_shares[idx] > current_shares[idx]:
                 # Buy recommendation
-                shares_to_buy = target_shares - current_shares
-                investment_amount = shares_to_buy * current_price
+                shares_to_buy = int(target_shares[idx] - current_shares[idx])
                 
                 # Calculate risk metrics
                 atr = self.atr_values.get(ticker, 0)
@@ -487,7 +597,7 @@ class InvestmentOptimizer:
                         'stop_loss': stop_loss,
                         'max_risk': max_risk,
                         'expected_return': self.expected_returns.get(ticker, 0),
-                        'portfolio_weight': optimal_weight
+                        'portfolio_weight': weights[idx]
                     }
                 }
             else:
@@ -503,68 +613,10 @@ class InvestmentOptimizer:
         
         return recommendations
     
-    def _optimize_share_allocation(self, available_stocks: List[Dict], total_capital: float) -> Dict[str, int]:
-        """Optimize share allocation to maximize capital utilization using iterative approach"""
-        if not available_stocks:
-            return {}
-        
-        # Start with basic allocation (truncated shares)
-        allocation = {}
-        total_invested = 0
-        
-        for stock in available_stocks:
-            ticker = stock['ticker']
-            price = stock['price']
-            target_investment = stock['target_investment']
-            
-            if price > 0:
-                shares = int(target_investment / price)
-                allocation[ticker] = shares
-                total_invested += shares * price
-        
-        remaining_capital = total_capital - total_invested
-        
-        # Iteratively allocate remaining capital to maximize utilization
-        # Priority: stocks with highest weight that can still be purchased
-        max_iterations = 20
-        iteration = 0
-        
-        while remaining_capital > 0 and iteration < max_iterations:
-            iteration += 1
-            best_purchase = None
-            best_efficiency = 0
-            
-            for stock in available_stocks:
-                ticker = stock['ticker']
-                price = stock['price']
-                optimal_weight = stock['optimal_weight']
-                current_allocation = allocation.get(ticker, 0)
-                current_investment = current_allocation * price
-                
-                # Check if we can afford one more share
-                if price <= remaining_capital:
-                    # Calculate efficiency: how close this gets us to optimal weight
-                    new_investment = current_investment + price
-                    target_investment = stock['target_investment']
-                    
-                    # Efficiency metric: weight significance + proximity to target
-                    weight_importance = optimal_weight * 100  # Higher weight = more important
-                    proximity_to_target = 1.0 - abs(new_investment - target_investment) / max(target_investment, 1)
-                    efficiency = weight_importance * proximity_to_target
-                    
-                    if efficiency > best_efficiency:
-                        best_efficiency = efficiency
-                        best_purchase = ticker
-            
-            # Make the best purchase
-            if best_purchase:
-                price = next(s['price'] for s in available_stocks if s['ticker'] == best_purchase)
-                allocation[best_purchase] = allocation.get(best_purchase, 0) + 1
-                remaining_capital -= price
-            else:
-                break  # No more beneficial purchases possible
-        
-        return allocation
+    def _optimize_share_allocation(self, prices: np.ndarray, weights: np.ndarray, total_capital: float) -> np.ndarray:
+        """Optimize share allocation to maximize capital utilization using a priority queue"""
+        targets = total_capital * weights
+        return _greedy_allocation(prices, weights, targets, float(total_capital), 20)
     
     def _calculate_additional_capital_needed(self, recommendations: Dict[str, Dict[str, Any]]) -> None:
         """Calculate additional capital needed to fully utilize optimal portfolio allocation"""
@@ -574,19 +626,20 @@ class InvestmentOptimizer:
         
         try:
             # Calculate current portfolio value (cash + holdings)
-            current_holdings_value = 0
-            for ticker, holdings in self.config['stocks'].items():
-                current_price = self.current_prices.get(ticker, 0)
-                current_holdings_value += holdings['shares'] * current_price
+            stocks = self.config['stocks']
+            held_shares = np.fromiter((holdings['shares'] for holdings in stocks.values()),
+                                      dtype=np.float64, count=len(stocks))
+            held_prices = np.fromiter((self.current_prices.get(ticker, 0) for ticker in stocks),
+                                      dtype=np.float64, count=len(stocks))
+            current_holdings_value = float(held_shares @ held_prices)
             
             total_current_value = self.config['cash'] + current_holdings_value
             
             # Calculate total investment needed for new purchases
-            total_new_investment = sum(
-                rec['shares'] * rec['current_price'] 
-                for rec in recommendations.values() 
-                if rec['action'] == 'BUY'
-            )
+            buys = [rec for rec in recommendations.values() if rec['action'] == 'BUY']
+            buy_shares = np.fromiter((rec['shares'] for rec in buys), dtype=np.float64, count=len(buys))
+            buy_prices = np.fromiter((rec['current_price'] for rec in buys), dtype=np.float64, count=len(buys))
+            total_new_investment = float(buy_shares @ buy_prices)
             
             # Calculate cash remaining after new investments
             cash_after_investment = self.config['cash'] - total_new_investment
@@ -669,21 +722,24 @@ class InvestmentOptimizer:
         total_capital = cash + total_value
         print(f"   {EMOJIS['cash']} Cash Available: {format_currency(cash)} ({format_percentage(cash/total_capital * 100)})")
         
-        # Recommendations
+        # Recommendations (totals accumulated in the same pass)
         print(f"\n{EMOJIS['dart']} Recommended Actions:")
         total_investment = 0
+        total_risk = 0
         
         for ticker, rec in recommendations.items():
+            details = rec.get('details', {})
             print(format_recommendation(
                 ticker, 
                 rec['action'], 
                 rec['current_price'],
                 rec.get('shares', 0),
-                rec.get('details', {})
+                details
             ))
             
             if rec['action'] == 'BUY':
                 total_investment += rec['shares'] * rec['current_price']
+            total_risk += details.get('max_risk', 0)
         
         # Investment summary
         print("\n" + "=" * 70)
@@ -697,11 +753,7 @@ class InvestmentOptimizer:
             print(f"{EMOJIS['dart']} Portfolio Expected Return: {format_percentage(self.portfolio_return * 100)} annually")
             print(f"{EMOJIS['chart']} Portfolio Sharpe Ratio: {sharpe:.2f} (estimated)")
         
-        # Calculate total risk
-        total_risk = sum(
-            rec.get('details', {}).get('max_risk', 0) 
-            for rec in recommendations.values()
-        )
+        # Total risk
         print(f"{EMOJIS['scales']} Total Portfolio Risk: {format_currency(total_risk)} ({format_percentage(total_risk/total_capital * 100)} of capital)")
         
         # Display additional capital needed if applicable
@@ -726,13 +778,20 @@ class InvestmentOptimizer:
             if not self.fetch_market_data():
                 return False
             
-            # Calculate metrics
-            if not self.calculate_portfolio_metrics():
-                return False
-            
-            # Optimize
-            if not self.optimize_portfolio():
-                return False
+            # Skip metrics and optimization when prices and inputs are unchanged
+            metrics_key = self._metrics_cache_key()
+            if metrics_key == self._last_metrics_key and self.optimal_weights is not None:
+                logging.info("Price data unchanged - reusing previous portfolio optimization")
+            else:
+                # Calculate metrics
+                if not self.calculate_portfolio_metrics():
+                    return False
+                
+                # Optimize
+                if not self.optimize_portfolio():
+                    return False
+                
+                self._last_metrics_key = metrics_key
             
             # Get recommendations
             recommendations = self.get_trading_recommendations()
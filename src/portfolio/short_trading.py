@@ -16,22 +16,131 @@ Author: Investment Management System
 Date: September 2025
 """
 
+import io
 import os
+import re
 import sys
+import csv
+import json
 import time
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 from typing import Dict, List, Tuple, Optional
 import colorama
 from colorama import Fore, Back, Style
+import signal
 import threading
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..utils.jit import njit, NUMBA_AVAILABLE
+from ..utils.constants import MAX_DOWNLOAD_WORKERS
 
 # Initialize colorama for colored output
 colorama.init()
 
+# Alert codes produced by _classify_alerts
+ALERT_NONE = 0
+ALERT_WARNING = 1
+ALERT_STOP_LOSS = 2
+ALERT_TARGET_REACHED = 3
+
+# US equity regular session, in exchange time (holidays not accounted for)
+try:
+    MARKET_TIMEZONE = ZoneInfo('America/New_York')
+except ZoneInfoNotFoundError:
+    MARKET_TIMEZONE = None  # No tz database: always treat the market as possibly open
+MARKET_OPEN_TIME = dt_time(9, 30)
+MARKET_CLOSE_TIME = dt_time(16, 0)
+
+# "key = value" config line; blank and '#' comment lines don't match
+_CONFIG_LINE_RE = re.compile(r'^\s*([^#=\s][^=]*?)\s*=\s*(.*?)\s*$')
+
+# Colored status column per alert code
+STATUS_LABELS = {
+    ALERT_TARGET_REACHED: f"{Fore.GREEN}🎯 SELL!{Style.RESET_ALL}",
+    ALERT_STOP_LOSS: f"{Fore.RED}🛑 SELL!{Style.RESET_ALL}",
+    ALERT_WARNING: f"{Fore.YELLOW}⚠️  WATCH{Style.RESET_ALL}",
+    ALERT_NONE: f"{Fore.GREEN}✅ HOLD{Style.RESET_ALL}"
+}
+
+# Portfolio status row, filled with a single str.format call per holding
+_ROW_FORMAT = (
+    "{symbol:<8} {shares:<8} ${buy_price:<11.2f} ${current_price:<11.2f} "
+    "${current_value:<11.2f} {color}{sign}${pnl_amount:<11.2f}" + Style.RESET_ALL + " "
+    "{color}{sign}{pnl_percentage:<9.1f}%" + Style.RESET_ALL + " {buy_date:<12} {status}"
+)
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _compute_alerts(shares: np.ndarray, cost_basis: np.ndarray, current_prices: np.ndarray,
+                    target_gain_pct: float, max_loss_pct: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """P&L amount, P&L ratio (decimal) and alert code for every holding
+    
+    Thresholds are decimals as well, so no percentage scaling happens here.
+    Alert codes check target gain first, then stop loss, then any loss.
+    """
+    n_holdings = len(shares)
+    pnl_amount = np.empty(n_holdings, dtype=np.float64)
+    pnl_ratio = np.empty(n_holdings, dtype=np.float64)
+    alert_codes = np.zeros(n_holdings, dtype=np.int8)
+    
+    for i in range(n_holdings):
+        pnl_amount[i] = shares[i] * current_prices[i] - cost_basis[i]
+        pnl_ratio[i] = pnl_amount[i] / cost_basis[i]
+        
+        if pnl_ratio[i] >= target_gain_pct:
+            alert_codes[i] = ALERT_TARGET_REACHED
+        elif pnl_ratio[i] <= -max_loss_pct:
+            alert_codes[i] = ALERT_STOP_LOSS
+        elif pnl_amount[i] < 0:
+            alert_codes[i] = ALERT_WARNING
+    
+    return pnl_amount, pnl_ratio, alert_codes
+
+def _parse_trade_date(value: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD trade date once, returning None if it is not in that format"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def _market_phase(timestamp: float) -> Tuple[date, str]:
+    """Exchange date and session phase ('closed', 'pre', 'open' or 'post') at a Unix timestamp"""
+    moment = datetime.fromtimestamp(timestamp, MARKET_TIMEZONE)
+    if moment.weekday() >= 5:
+        return moment.date(), 'closed'
+    if moment.time() < MARKET_OPEN_TIME:
+        return moment.date(), 'pre'
+    if moment.time() < MARKET_CLOSE_TIME:
+        return moment.date(), 'open'
+    return moment.date(), 'post'
+
+def _price_still_current(fetched_at: float, now: float) -> bool:
+    """True if no trading has happened since fetched_at: same exchange date and closed session"""
+    if MARKET_TIMEZONE is None:
+        return False
+    fetched_phase = _market_phase(fetched_at)
+    return fetched_phase[1] != 'open' and fetched_phase == _market_phase(now)
+
+def _now_str() -> str:
+    """Current local time formatted for status headers"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+
 class ShortTradingManager:
     """Manage short-term trading operations with real-time monitoring"""
     
+    PRICE_CACHE_TTL = 30  # Seconds a fetched price is reused
+    PRICE_SNAPSHOT_FILE = 'short_trading_prices.json'  # Last-known prices, next to the config file
+    
+    # Numbered order keys (buy_stocks_1, sell_stocks_2, ...) indexed at parse time
+    ORDER_KEY_PREFIXES = ('buy_stocks_', 'sell_stocks_')
+    
+    # Shared across instances: {symbol: (price, fetched_at)}
+    _price_cache: Dict[str, Tuple[float, float]] = {}
+    
     def __init__(self, target_gain_pct: float, max_loss_pct: float, config_file: str = 'short_trading.txt'):
         """
         Initialize short trading manager
@@ -44,13 +153,108 @@ class ShortTradingManager:
         self.config_file = config_file
         self.target_gain_pct = target_gain_pct / 100  # Convert to decimal
         self.max_loss_pct = max_loss_pct / 100
-        self.holdings = {}  # {symbol: {'shares': int, 'buy_price': float, 'buy_date': str, 'current_price': float, 'total_investment': float}}
+        self.holdings = {}  # {symbol: {'shares': int, 'buy_price': float, 'buy_date': str, 'buy_date_obj': date | None, 'current_price': float, 'total_investment': float (cost basis)}}
         self.blink_thread = None
-        self.stop_blinking = False
+        self.stop_blinking = threading.Event()  # Set to end the fallback blink thread
+        self._shutdown = threading.Event()  # Set to end run_monitoring_loop
+        self._ticker_cache: Dict[str, yf.Ticker] = {}  # Reused across monitoring cycles
+        self._fetch_executor: Optional[ThreadPoolExecutor] = None  # Per-symbol fallback pool, created on first use
+        self._holdings_arrays = None  # Struct-of-arrays view of holdings, rebuilt lazily
+        self._config_cache = None  # ((mtime_ns, size), lines, parsed values, key line indices, order keys) of the config file
+        self._orders_signature = None  # Config signature as of the last buy/sell order pass
+        self._price_snapshot_path = os.path.join(os.path.dirname(os.path.abspath(config_file)),
+                                                 self.PRICE_SNAPSHOT_FILE)
+        
+        # Compile the alert kernel up front so the first monitoring tick is not delayed
+        if NUMBA_AVAILABLE:
+            warmup = np.ones(1, dtype=np.float64)
+            _compute_alerts(warmup, warmup, warmup, self.target_gain_pct, self.max_loss_pct)
         
-        # Load existing holdings on startup
+        # Load existing holdings and last-known prices on startup
         self.load_existing_holdings()
+        self._load_price_snapshot()
+        
+    def _load_price_snapshot(self):
+        """Seed the price cache from the last-known prices saved by a previous run"""
+        try:
+            with open(self._price_snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            # Validate every entry before seeding, so a malformed file is ignored as a whole
+            prices = {symbol: (float(price), float(fetched_at))
+                      for symbol, (price, fetched_at) in snapshot.items()}
+        except FileNotFoundError:
+            return
+        except (OSError, TypeError, ValueError, AttributeError) as e:
+            print(f"⚠️  Ignoring unreadable price cache {self._price_snapshot_path}: {e}")
+            return
+        
+        for symbol, (price, fetched_at) in prices.items():
+            cached = self._price_cache.get(symbol)
+            if cached is None or cached[1] < fetched_at:
+                self._price_cache[symbol] = (price, fetched_at)
+    
+    def _save_price_snapshot(self):
+        """Persist prices fetched within the last day, replacing the file atomically"""
+        cutoff = time.time() - 86400
+        snapshot = {symbol: list(entry) for symbol, entry in self._price_cache.items() if entry[1] >= cutoff}
+        snapshot_dir = os.path.dirname(self._price_snapshot_path)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix='.short_trading_prices_', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self._price_snapshot_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"⚠️  Could not save price cache: {e}")
+        
+    def _config_signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of the config file, or None if it doesn't exist"""
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_config(self) -> Tuple[List[str], Dict[str, str], Dict[str, List[int]], Dict[str, List[str]]]:
+        """Return the config file's raw lines, key/value pairs, key line indices and numbered
+        order keys by prefix, rereading only when it changed"""
+        stat = os.stat(self.config_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._config_cache is not None and self._config_cache[0] == signature:
+            return self._config_cache[1:]
+        
+        # Only reached after an edit; the raw lines are kept because updates rewrite them
+        with open(self.config_file, 'r', encoding='utf-8-sig') as f:  # Drops a leading BOM
+            lines = f.readlines()
         
+        values, line_index, order_keys = self._parse_config_lines(lines)
+        self._config_cache = (signature, lines, values, line_index, order_keys)
+        return lines, values, line_index, order_keys
+    
+    @classmethod
+    def _parse_config_lines(cls, lines: List[str]) -> Tuple[Dict[str, str], Dict[str, List[int]], Dict[str, List[str]]]:
+        """Extract key = value pairs, the line numbers each key appears on and the numbered
+        order keys, skipping blanks and comments"""
+        values = {}
+        line_index = {}
+        order_keys = {prefix: [] for prefix in cls.ORDER_KEY_PREFIXES}
+        for i, line in enumerate(lines):
+            match = _CONFIG_LINE_RE.match(line)
+            if match:
+                key, value = match.groups()
+                values[key] = value  # Store all key-value pairs, not just predefined ones
+                if key not in line_index:
+                    line_index[key] = []
+                    for prefix in cls.ORDER_KEY_PREFIXES:
+                        if key.startswith(prefix):
+                            order_keys[prefix].append(key)
+                line_index[key].append(i)
+        return values, line_index, order_keys
+    
     def parse_config_file(self) -> Dict:
         """Parse the short trading configuration file"""
         config = {
@@ -60,19 +264,14 @@ class ShortTradingManager:
             'sold_positions': ''
         }
         
-        if not os.path.exists(self.config_file):
-            print(f"⚠️  Short trading config file {self.config_file} not found. Using defaults.")
-            return config
-            
+        # A single stat() both detects a missing file and validates the cache
         try:
-            with open(self.config_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        config[key] = value  # Store all key-value pairs, not just predefined ones
+            _, values, _, order_keys = self._read_config()
+            config.update(values)
+            config['_buy_stocks_indexed'] = list(order_keys['buy_stocks_'])
+            config['_sell_stocks_indexed'] = list(order_keys['sell_stocks_'])
+        except FileNotFoundError:
+            print(f"⚠️  Short trading config file {self.config_file} not found. Using defaults.")
         except Exception as e:
             print(f"❌ Error reading config file: {e}")
             
@@ -111,9 +310,11 @@ class ShortTradingManager:
                     'shares': shares,
                     'buy_price': buy_price,
                     'buy_date': buy_date,
+                    'buy_date_obj': _parse_trade_date(buy_date),  # Parsed once for date arithmetic
                     'current_price': buy_price,  # Will be updated with real prices
                     'total_investment': total_investment
                 }
+                self._holdings_arrays = None
                 
                 print(f"📈 Loaded: {symbol} - {shares} shares @ ${buy_price:.2f} = ${total_investment:.2f} (bought {buy_date})")
                 loaded_count += 1
@@ -124,22 +325,17 @@ class ShortTradingManager:
         except Exception as e:
             print(f"❌ Error loading existing holdings: {e}")
     
+    def _serialize_holdings(self) -> str:
+        """Build the pipe-separated current_holdings value from all positions"""
+        return '|'.join(
+            f"{symbol},{holding['shares']},{holding['buy_price']},{holding['buy_date']}"
+            for symbol, holding in self.holdings.items()
+        )
+    
     def update_current_holdings(self):
         """Update current_holdings field with all positions for persistence"""
         try:
-            # Build current_holdings string from all holdings
-            holdings_list = []
-            for symbol, holding in self.holdings.items():
-                shares = holding['shares']
-                buy_price = holding['buy_price']
-                buy_date = holding['buy_date']
-                holdings_list.append(f"{symbol},{shares},{buy_price},{buy_date}")
-            
-            # Create pipe-separated string
-            current_holdings_str = '|'.join(holdings_list)
-            
-            # Update the config file
-            self.update_config_file({'current_holdings': current_holdings_str})
+            self.update_config_file({'current_holdings': self._serialize_holdings()})
             
         except Exception as e:
             print(f"❌ Error updating current_holdings: {e}")
@@ -148,43 +344,95 @@ class ShortTradingManager:
         """Update the short trading configuration file with new values"""
         try:
             # Read current config
-            lines = []
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    lines = f.readlines()
-            
-            # Update specified keys
-            updated_lines = []
-            updated_keys = set()
+            lines, values, line_index = [], {}, {}
+            order_keys = {prefix: [] for prefix in self.ORDER_KEY_PREFIXES}
+            base_signature = None
+            try:
+                lines, values, line_index, order_keys = self._read_config()
+                base_signature = self._config_cache[0]
+            except FileNotFoundError:
+                pass
             
-            for line in lines:
-                stripped = line.strip()
-                if stripped and not stripped.startswith('#') and '=' in stripped:
-                    key, value = stripped.split('=', 1)
-                    key = key.strip()
-                    if key in updates:
-                        updated_lines.append(f"{key} = {updates[key]}\n")
-                        updated_keys.add(key)
-                    else:
-                        updated_lines.append(line)
+            # Patch only the lines holding updated keys; add any new keys at the end
+            updated_lines = list(lines)
+            values = dict(values)
+            line_index = {key: list(indices) for key, indices in line_index.items()}
+            order_keys = {prefix: list(keys) for prefix, keys in order_keys.items()}
+            for key, value in updates.items():
+                new_line = f"{key} = {value}\n"
+                if key in line_index:
+                    for i in line_index[key]:
+                        updated_lines[i] = new_line
                 else:
-                    updated_lines.append(line)
+                    line_index[key] = [len(updated_lines)]
+                    updated_lines.append(new_line)
+                    for prefix in self.ORDER_KEY_PREFIXES:
+                        if key.startswith(prefix):
+                            order_keys[prefix].append(key)
+                values[key] = str(value).strip()
             
-            # Add any new keys that weren't in the file
-            for key, value in updates.items():
-                if key not in updated_keys:
-                    updated_lines.append(f"{key} = {value}\n")
+            # Write to a temp file in one call, then atomically swap it in
+            config_dir = os.path.dirname(os.path.abspath(self.config_file))
+            fd, tmp_path = tempfile.mkstemp(dir=config_dir, prefix='.short_trading_', suffix='.tmp')
+            try:
+                try:
+                    os.write(fd, ''.join(updated_lines).encode())
+                finally:
+                    os.close(fd)
+                try:
+                    mode = os.stat(self.config_file).st_mode
+                except FileNotFoundError:
+                    mode = 0o644
+                os.chmod(tmp_path, mode & 0o777)
+                os.replace(tmp_path, self.config_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
             
-            # Write back to file
-            with open(self.config_file, 'w') as f:
-                f.writelines(updated_lines)
+            # Keep what we just wrote as the cached copy so the next parse skips the reread
+            stat = os.stat(self.config_file)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            self._config_cache = (signature, updated_lines, values, line_index, order_keys)
+            
+            # Our own write shouldn't retrigger the order pass, unless the file was edited since it ran
+            if base_signature == self._orders_signature:
+                self._orders_signature = signature
                 
             return True
                 
         except Exception as e:
             print(f"❌ Error updating config file: {e}")
+            self._orders_signature = None  # Orders may still be in the file; retry them next pass
             return False
     
+    @staticmethod
+    def _parse_buy_orders(buy_orders: List[str]) -> Optional[List[Tuple[str, int, float, str]]]:
+        """Parse SYMBOL,SHARES,PRICE,DATE orders in one pass of the C CSV parser
+        
+        Returns None if any order is malformed, so the caller can fall back to
+        per-order parsing and report which one failed.
+        """
+        if not all(order.count(',') == 3 for order in buy_orders):
+            return None
+        
+        try:
+            orders = pd.read_csv(
+                io.StringIO('\n'.join(buy_orders)), header=None,
+                names=['symbol', 'shares', 'price', 'date'],
+                dtype={'symbol': str, 'shares': np.int64, 'price': np.float64, 'date': str},
+                skipinitialspace=True, keep_default_na=False, skip_blank_lines=False,
+                quoting=csv.QUOTE_NONE
+            )
+        except (ValueError, pd.errors.ParserError):
+            return None
+        
+        if len(orders) != len(buy_orders):
+            return None
+        
+        return list(zip(orders['symbol'].str.strip().tolist(), orders['shares'].tolist(),
+                        orders['price'].tolist(), orders['date'].str.strip().tolist()))
+    
     def process_buy_orders(self) -> bool:
         """Process any new buy orders from buy_stocks configuration"""
         config = self.parse_config_file()
@@ -204,9 +452,9 @@ class ShortTradingManager:
                 buy_orders.append(buy_stocks)
         
         # Format 2: Multiple buy_stocks_N entries
-        for key, value in config.items():
-            if key.startswith('buy_stocks_') and value.strip():
-                buy_orders.append(value.strip())
+        for key in config.get('_buy_stocks_indexed', []):
+            if config[key].strip():
+                buy_orders.append(config[key].strip())
         
         if not buy_orders:
             return False
@@ -215,21 +463,26 @@ class ShortTradingManager:
         
         processed_count = 0
         failed_count = 0
+        parsed_orders = self._parse_buy_orders(buy_orders)
         
         for i, buy_order in enumerate(buy_orders, 1):
             try:
                 print(f"\n📋 Order {i}/{len(buy_orders)}: {buy_order}")
                 
-                # Parse buy order: symbol,shares,price_per_share,date
-                parts = buy_order.split(',')
-                if len(parts) != 4:
-                    print(f"❌ Invalid format. Expected: SYMBOL,SHARES,PRICE_PER_SHARE,DATE")
-                    failed_count += 1
-                    continue
+                if parsed_orders is not None:
+                    symbol, shares, buy_price, buy_date = parsed_orders[i - 1]
+                else:
+                    # Parse buy order: symbol,shares,price_per_share,date
+                    parts = buy_order.split(',')
+                    if len(parts) != 4:
+                        print(f"❌ Invalid format. Expected: SYMBOL,SHARES,PRICE_PER_SHARE,DATE")
+                        failed_count += 1
+                        continue
+                    
+                    symbol, shares, buy_price, buy_date = [part.strip() for part in parts]
+                    shares = int(shares)
+                    buy_price = float(buy_price)
                 
-                symbol, shares, buy_price, buy_date = [part.strip() for part in parts]
-                shares = int(shares)
-                buy_price = float(buy_price)
                 total_investment = shares * buy_price
                 
                 # Check if symbol already exists in holdings
@@ -243,9 +496,11 @@ class ShortTradingManager:
                     'shares': shares,
                     'buy_price': buy_price,
                     'buy_date': buy_date,
+                    'buy_date_obj': _parse_trade_date(buy_date),  # Parsed once for date arithmetic
                     'current_price': buy_price,
                     'total_investment': total_investment
                 }
+                self._holdings_arrays = None
                 
                 print(f"✅ {symbol}: {shares} shares @ ${buy_price:.2f} = ${total_investment:.2f} on {buy_date}")
                 processed_count += 1
@@ -258,13 +513,12 @@ class ShortTradingManager:
         updates = {'buy_stocks': ''}
         
         # Clear any buy_stocks_N fields
-        for key in config.keys():
-            if key.startswith('buy_stocks_'):
-                updates[key] = ''
+        for key in config.get('_buy_stocks_indexed', []):
+            updates[key] = ''
         
-        # Update current_holdings with new positions (persist them)
+        # Persist new positions to current_holdings in the same write
         if processed_count > 0:
-            self.update_current_holdings()
+            updates['current_holdings'] = self._serialize_holdings()
         
         if self.update_config_file(updates):
             print(f"\n🎯 Summary: {processed_count} positions added, {failed_count} failed")
@@ -296,9 +550,9 @@ class ShortTradingManager:
                 sell_orders.append(sell_stocks)
         
         # Format 2: Multiple sell_stocks_N entries
-        for key, value in config.items():
-            if key.startswith('sell_stocks_') and value.strip():
-                sell_orders.append(value.strip())
+        for key in config.get('_sell_stocks_indexed', []):
+            if config[key].strip():
+                sell_orders.append(config[key].strip())
         
         if not sell_orders:
             return False
@@ -308,6 +562,10 @@ class ShortTradingManager:
         processed_count = 0
         failed_count = 0
         
+        # Collect sale records and join once at the end instead of regrowing the string per sale
+        current_sold = config.get('sold_positions', '').strip()
+        sold_records = [current_sold] if current_sold else []
+        
         for i, sell_order in enumerate(sell_orders, 1):
             try:
                 print(f"\n📋 Sell Order {i}/{len(sell_orders)}: {sell_order}")
@@ -345,9 +603,11 @@ class ShortTradingManager:
                 gain_loss_percent = (gain_loss / total_cost_basis) * 100
                 
                 # Update holdings
+                self._holdings_arrays = None
                 if shares_sold == current_shares:
                     # Selling entire position - remove from holdings
                     del self.holdings[symbol]
+                    self._ticker_cache.pop(symbol, None)
                     print(f"✅ SOLD ENTIRE POSITION: {symbol} - {shares_sold} shares @ ${sale_price:.2f}")
                 else:
                     # Partial sale - update remaining shares
@@ -358,17 +618,7 @@ class ShortTradingManager:
                     print(f"✅ PARTIAL SALE: {symbol} - Sold {shares_sold} shares @ ${sale_price:.2f}, {remaining_shares} shares remaining")
                 
                 # Record the sale in sold_positions
-                sale_record = f"{symbol},{sale_price},{sale_date},{gain_loss:.2f},{gain_loss_percent:.1f}"
-                
-                # Update sold_positions in config
-                current_sold = config.get('sold_positions', '').strip()
-                if current_sold:
-                    new_sold = f"{current_sold}|{sale_record}"
-                else:
-                    new_sold = sale_record
-                
-                # Update config with new sold position
-                config['sold_positions'] = new_sold
+                sold_records.append(f"{symbol},{sale_price},{sale_date},{gain_loss:.2f},{gain_loss_percent:.1f}")
                 
                 print(f"💰 P&L: ${gain_loss:.2f} ({gain_loss_percent:.1f}%) on {shares_sold} shares")
                 
@@ -381,19 +631,18 @@ class ShortTradingManager:
         print(f"\n🎯 Sell Summary: {processed_count} transactions completed, {failed_count} failed")
         
         if processed_count > 0:
-            # Save updated holdings and sold positions
-            self.update_current_holdings()
-            
-            # Clear sell order fields
-            updates = {'sell_stocks': ''}
+            # Save holdings, sold positions and cleared sell orders in one atomic write
+            updates = {
+                'current_holdings': self._serialize_holdings(),
+                'sell_stocks': ''
+            }
             
             # Clear any sell_stocks_N fields and update sold_positions
-            for key in config.keys():
-                if key.startswith('sell_stocks_'):
-                    updates[key] = ''
+            for key in config.get('_sell_stocks_indexed', []):
+                updates[key] = ''
             
             # Update sold_positions
-            updates['sold_positions'] = config.get('sold_positions', '')
+            updates['sold_positions'] = '|'.join(sold_records)
             
             if self.update_config_file(updates):
                 print(f"💾 Holdings updated and sell orders cleared")
@@ -409,182 +658,266 @@ class ShortTradingManager:
         
         symbols = list(self.holdings.keys())
         try:
-            # Fetch current prices
             current_prices = {}
+            now = time.time()
             
+            # Reuse prices fetched within the cache TTL, or at any age while the market
+            # has stayed closed since the fetch (e.g. restarts after the close)
+            stale_symbols = []
             for symbol in symbols:
-                # Fetch each symbol individually to avoid DataFrame structure issues
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='1d')
-                if not hist.empty and 'Close' in hist.columns:
-                    current_prices[symbol] = float(hist['Close'].iloc[-1])
+                cached = self._price_cache.get(symbol)
+                if cached is not None and (now - cached[1] < self.PRICE_CACHE_TTL
+                                           or _price_still_current(cached[1], now)):
+                    current_prices[symbol] = cached[0]
                 else:
-                    print(f"⚠️  Warning: Could not fetch price for {symbol}")
+                    stale_symbols.append(symbol)
+            
+            # Fetch the remaining prices in one batched request
+            fetched = {}
+            if stale_symbols:
+                try:
+                    data = yf.download(stale_symbols, period='1d', group_by='ticker', progress=False,
+                                       threads=min(MAX_DOWNLOAD_WORKERS, len(stale_symbols)))
+                    for symbol in stale_symbols:
+                        try:
+                            # Columns are (symbol, field) unless a single symbol came back flat
+                            hist = data[symbol] if data.columns.nlevels > 1 else data
+                            closes = hist['Close'].dropna()
+                            if not closes.empty:
+                                fetched[symbol] = float(closes.iloc[-1])
+                        except KeyError:
+                            pass
+                except Exception as e:
+                    print(f"⚠️  Batch price download failed ({e}), fetching symbols individually")
+            
+            # Fall back to concurrent per-symbol requests for anything the batch missed
+            missing_symbols = [symbol for symbol in stale_symbols if symbol not in fetched]
+            if missing_symbols:
+                if self._fetch_executor is None:
+                    # Kept for the manager's lifetime so fallback cycles don't respawn threads
+                    self._fetch_executor = ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS,
+                                                              thread_name_prefix='price-fetch')
+                for symbol, price in self._fetch_executor.map(self._fetch_one, missing_symbols):
+                    if price is not None:
+                        fetched[symbol] = price
+                    else:
+                        print(f"⚠️  Warning: Could not fetch price for {symbol}")
+            
+            for symbol, price in fetched.items():
+                current_prices[symbol] = price
+                self._price_cache[symbol] = (price, now)
+            if fetched:
+                self._save_price_snapshot()
             
             # Update holdings with current prices
             for symbol, price in current_prices.items():
                 if symbol in self.holdings:
                     self.holdings[symbol]['current_price'] = price
             
+            # Positions are unchanged, so refresh just the price column of the array view
+            if self._holdings_arrays is not None:
+                array_symbols, _, _, array_prices = self._holdings_arrays
+                array_prices[:] = np.fromiter((self.holdings[symbol]['current_price'] for symbol in array_symbols),
+                                              dtype=np.float64, count=len(array_symbols))
+            
             return current_prices
             
         except Exception as e:
             print(f"❌ Error fetching current prices: {e}")
             return {}
     
+    def _get_ticker(self, symbol: str) -> yf.Ticker:
+        """Return a cached yf.Ticker for symbol, creating it on first use"""
+        ticker = self._ticker_cache.get(symbol)
+        if ticker is None:
+            # yfinance routes every Ticker through its shared session, so reusing
+            # instances keeps connections and cookie/crumb state warm across cycles.
+            # Don't pass session=: it replaces that process-wide session, dropping
+            # the curl_cffi browser impersonation Yahoo requires
+            ticker = self._ticker_cache[symbol] = yf.Ticker(symbol)
+        return ticker
+    
+    def _fetch_one(self, symbol: str) -> Tuple[str, Optional[float]]:
+        """Fetch the latest close for a single symbol"""
+        try:
+            hist = self._get_ticker(symbol).history(period='1d')
+            if not hist.empty and 'Close' in hist.columns:
+                return symbol, float(hist['Close'].iloc[-1])
+        except Exception:
+            pass
+        return symbol, None
+    
     def calculate_pnl(self, symbol: str) -> Tuple[float, float]:
         """Calculate P&L for a symbol"""
         if symbol not in self.holdings:
             return 0.0, 0.0
         
         holding = self.holdings[symbol]
-        shares = holding['shares']
-        buy_price = holding['buy_price']
-        current_price = holding['current_price']
-        
-        # P&L calculation with shares
-        total_buy_value = shares * buy_price
-        total_current_value = shares * current_price
+        total_buy_value = holding['total_investment']  # Cost basis, kept in sync with shares
+        total_current_value = holding['shares'] * holding['current_price']
         
         pnl_amount = total_current_value - total_buy_value
         pnl_percentage = (pnl_amount / total_buy_value) * 100
         
         return pnl_amount, pnl_percentage
     
+    def _get_holdings_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Return (symbols, shares, cost basis, current prices) as parallel arrays"""
+        if self._holdings_arrays is None:
+            holdings = self.holdings.values()
+            count = len(self.holdings)
+            self._holdings_arrays = (
+                list(self.holdings),
+                np.fromiter((h['shares'] for h in holdings), dtype=np.float64, count=count),
+                np.fromiter((h['total_investment'] for h in holdings), dtype=np.float64, count=count),
+                np.fromiter((h['current_price'] for h in holdings), dtype=np.float64, count=count)
+            )
+        return self._holdings_arrays
+    
+    def get_holdings_frame(self) -> pd.DataFrame:
+        """Return holdings as a symbol-indexed DataFrame with P&L and status columns"""
+        frame = pd.DataFrame.from_dict(self.holdings, orient='index')
+        frame.index.name = 'symbol'
+        frame['current_value'] = frame['shares'] * frame['current_price']
+        # Reuse the owned, writeable arrays: pandas hands out read-only views, which
+        # Numba treats as a different signature and would compile a second time
+        _, shares, cost_basis, current_prices = self._get_holdings_arrays()
+        frame['pnl_amount'], frame['pnl_ratio'], frame['status'] = _compute_alerts(
+            shares, cost_basis, current_prices, self.target_gain_pct, self.max_loss_pct
+        )
+        return frame
+    
     def check_alerts(self) -> List[Dict]:
         """Check for profit/loss alerts"""
         alerts = []
         
-        for symbol in self.holdings:
-            pnl_amount, pnl_percentage = self.calculate_pnl(symbol)
-            pnl_decimal = pnl_percentage / 100
-            
-            alert_type = None
-            message = ""
-            
-            # Get holding info for better alerts
-            holding = self.holdings[symbol]
-            shares = holding['shares']
+        symbols, shares, cost_basis, current_prices = self._get_holdings_arrays()
+        pnl_amounts, pnl_ratios, alert_codes = _compute_alerts(
+            shares, cost_basis, current_prices, self.target_gain_pct, self.max_loss_pct
+        )
+        
+        # Build messages only for the (typically few) flagged holdings
+        for i in np.flatnonzero(alert_codes):
+            symbol = symbols[i]
+            holding_shares = self.holdings[symbol]['shares']
+            pnl_amount = float(pnl_amounts[i])
+            pnl_percentage = float(pnl_ratios[i]) * 100
+            code = alert_codes[i]
             
-            # Check for target gain
-            if pnl_decimal >= self.target_gain_pct:
+            if code == ALERT_TARGET_REACHED:
                 alert_type = "TARGET_REACHED"
-                message = f"🎯 TARGET GAIN REACHED! {symbol} ({shares} shares): +{pnl_percentage:.1f}% (${pnl_amount:.2f})"
-            
-            # Check for maximum loss
-            elif pnl_decimal <= -self.max_loss_pct:
+                message = f"🎯 TARGET GAIN REACHED! {symbol} ({holding_shares} shares): +{pnl_percentage:.1f}% (${pnl_amount:.2f})"
+            elif code == ALERT_STOP_LOSS:
                 alert_type = "STOP_LOSS"
-                message = f"🛑 STOP LOSS TRIGGERED! {symbol} ({shares} shares): -{abs(pnl_percentage):.1f}% (${pnl_amount:.2f})"
-            
-            # Check for any loss (warning)
-            elif pnl_amount < 0:
+                message = f"🛑 STOP LOSS TRIGGERED! {symbol} ({holding_shares} shares): -{abs(pnl_percentage):.1f}% (${pnl_amount:.2f})"
+            else:
                 alert_type = "WARNING"
-                message = f"⚠️  LOSS WARNING: {symbol} ({shares} shares): -{abs(pnl_percentage):.1f}% (${pnl_amount:.2f})"
+                message = f"⚠️  LOSS WARNING: {symbol} ({holding_shares} shares): -{abs(pnl_percentage):.1f}% (${pnl_amount:.2f})"
             
-            if alert_type:
-                alerts.append({
-                    'symbol': symbol,
-                    'type': alert_type,
-                    'message': message,
-                    'pnl_amount': pnl_amount,
-                    'pnl_percentage': pnl_percentage
-                })
+            alerts.append({
+                'symbol': symbol,
+                'type': alert_type,
+                'message': message,
+                'pnl_amount': pnl_amount,
+                'pnl_percentage': pnl_percentage
+            })
         
         return alerts
     
     def blink_message(self, message: str, color: str = Fore.RED):
-        """Display blinking message in a separate thread"""
-        def blink():
-            while not self.stop_blinking:
-                print(f"\r{color}{Style.BRIGHT}{message}{Style.RESET_ALL}", end='', flush=True)
-                time.sleep(0.5)
-                if not self.stop_blinking:
-                    print(f"\r{' ' * len(message)}", end='', flush=True)
-                    time.sleep(0.5)
-        
+        """Display blinking message"""
         if self.blink_thread and self.blink_thread.is_alive():
-            self.stop_blinking = True
+            self.stop_blinking.set()
             self.blink_thread.join()
         
-        self.stop_blinking = False
+        if not sys.stdout.isatty():
+            # Redirected output: print once rather than filling the log with redraws
+            print(message, flush=True)
+            return
+        
+        # Redraw the line from a background thread; stop_blink() can end it, whereas
+        # an SGR 5 line keeps blinking in the scrollback once later output follows it
+        def blink():
+            # Event.wait returns as soon as stop_blink() sets the event
+            while True:
+                print(f"\r{color}{Style.BRIGHT}{message}{Style.RESET_ALL}", end='', flush=True)
+                if self.stop_blinking.wait(0.5):
+                    break
+                print(f"\r{' ' * len(message)}", end='', flush=True)
+                if self.stop_blinking.wait(0.5):
+                    break
+        
+        self.stop_blinking.clear()
         self.blink_thread = threading.Thread(target=blink)
         self.blink_thread.daemon = True
         self.blink_thread.start()
     
     def stop_blink(self):
         """Stop the blinking message"""
-        self.stop_blinking = True
+        self.stop_blinking.set()
         if self.blink_thread and self.blink_thread.is_alive():
             self.blink_thread.join()
-        print()  # New line
+            print()  # New line
     
-    def display_portfolio_status(self):
-        """Display current portfolio status"""
+    def display_portfolio_status(self, timestamp: Optional[str] = None):
+        """Display current portfolio status, stamped with timestamp (defaults to now)"""
         if not self.holdings:
             print("📈 No active short trading positions")
             return
         
-        print(f"\n{'='*105}")
-        print(f"📊 SHORT TRADING PORTFOLIO STATUS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*105}")
-        print(f"{'Symbol':<8} {'Shares':<8} {'Buy Price':<12} {'Current':<12} {'Total Value':<12} {'P&L $':<12} {'P&L %':<10} {'Purchase Date':<12} {'Status'}")
-        print(f"{'-'*105}")
-        
-        total_pnl = 0
-        total_investment = 0
-        total_current_value = 0
-        
-        for symbol in self.holdings:
-            holding = self.holdings[symbol]
-            shares = holding['shares']
-            buy_price = holding['buy_price']
-            current_price = holding['current_price']
-            buy_date = holding['buy_date']
-            
-            # Calculate values
-            investment_amount = shares * buy_price
-            current_value = shares * current_price
-            pnl_amount, pnl_percentage = self.calculate_pnl(symbol)
-            
-            total_pnl += pnl_amount
-            total_investment += investment_amount
-            total_current_value += current_value
-            
-            # Determine status and color
-            if pnl_percentage >= self.target_gain_pct * 100:
-                status = f"{Fore.GREEN}🎯 SELL!{Style.RESET_ALL}"
-            elif pnl_percentage <= -self.max_loss_pct * 100:
-                status = f"{Fore.RED}🛑 SELL!{Style.RESET_ALL}"
-            elif pnl_amount < 0:
-                status = f"{Fore.YELLOW}⚠️  WATCH{Style.RESET_ALL}"
-            else:
-                status = f"{Fore.GREEN}✅ HOLD{Style.RESET_ALL}"
-            
-            # Format P&L with colors
-            pnl_color = Fore.GREEN if pnl_amount >= 0 else Fore.RED
-            pnl_sign = "+" if pnl_amount >= 0 else ""
-            
-            print(f"{symbol:<8} {shares:<8} ${buy_price:<11.2f} ${current_price:<11.2f} "
-                  f"${current_value:<11.2f} {pnl_color}{pnl_sign}${pnl_amount:<11.2f}{Style.RESET_ALL} "
-                  f"{pnl_color}{pnl_sign}{pnl_percentage:<9.1f}%{Style.RESET_ALL} {buy_date:<12} {status}")
+        frame = self.get_holdings_frame()
+        total_investment = frame['total_investment'].sum()
+        total_current_value = frame['current_value'].sum()
+        total_pnl = frame['pnl_amount'].sum()
+        
+        # Collect the whole table and emit it with a single write
+        lines = [
+            f"\n{'='*105}",
+            f"📊 SHORT TRADING PORTFOLIO STATUS - {timestamp or _now_str()}",
+            f"{'='*105}",
+            f"{'Symbol':<8} {'Shares':<8} {'Buy Price':<12} {'Current':<12} {'Total Value':<12} {'P&L $':<12} {'P&L %':<10} {'Purchase Date':<12} {'Status'}",
+            f"{'-'*105}"
+        ]
+        
+        # Per-row loop is only for colorized output; all math is done above
+        for row in frame.itertuples():
+            gain = row.pnl_amount >= 0
+            lines.append(_ROW_FORMAT.format(
+                symbol=row.Index, shares=row.shares, buy_price=row.buy_price,
+                current_price=row.current_price, current_value=row.current_value,
+                color=Fore.GREEN if gain else Fore.RED, sign="+" if gain else "",
+                pnl_amount=row.pnl_amount, pnl_percentage=row.pnl_ratio * 100,
+                buy_date=row.buy_date, status=STATUS_LABELS[row.status]
+            ))
         
-        print(f"{'-'*105}")
         total_color = Fore.GREEN if total_pnl >= 0 else Fore.RED
         total_sign = "+" if total_pnl >= 0 else ""
         total_pnl_pct = (total_pnl/total_investment*100) if total_investment > 0 else 0
-        print(f"{'TOTAL':<8} {'':<8} {'':<12} {'':<12} "
-              f"${total_current_value:<11.2f} {total_color}{total_sign}${total_pnl:<11.2f}{Style.RESET_ALL} "
-              f"{total_color}{total_sign}{total_pnl_pct:<9.1f}%{Style.RESET_ALL} {'':<12}")
-        print(f"📊 Total Invested: ${total_investment:.2f} | Current Value: ${total_current_value:.2f} | Portfolio P&L: {total_color}{total_sign}${total_pnl:.2f}{Style.RESET_ALL}")
-        print(f"{'='*105}")
+        lines.extend([
+            f"{'-'*105}",
+            f"{'TOTAL':<8} {'':<8} {'':<12} {'':<12} "
+            f"${total_current_value:<11.2f} {total_color}{total_sign}${total_pnl:<11.2f}{Style.RESET_ALL} "
+            f"{total_color}{total_sign}{total_pnl_pct:<9.1f}%{Style.RESET_ALL} {'':<12}",
+            f"📊 Total Invested: ${total_investment:.2f} | Current Value: ${total_current_value:.2f} | Portfolio P&L: {total_color}{total_sign}${total_pnl:.2f}{Style.RESET_ALL}",
+            f"{'='*105}",
+            ''
+        ])
+        sys.stdout.write('\n'.join(lines))
+        sys.stdout.flush()
     
-    def monitor_positions(self) -> List[Dict]:
+    def monitor_positions(self, timestamp: Optional[str] = None) -> List[Dict]:
         """Monitor all positions and return alerts"""
-        # Process any new buy orders first
-        self.process_buy_orders()
-        
-        # Process any sold stock transactions
-        self.process_sold_stocks()
+        # Orders can only appear if the config file changed since the last pass
+        signature = self._config_signature()
+        if signature is None or signature != self._orders_signature:
+            # Recorded before processing; successful writes below advance it, failed ones reset it
+            self._orders_signature = signature
+            
+            # Process any new buy orders first
+            self.process_buy_orders()
+            
+            # Process any sold stock transactions
+            self.process_sold_stocks()
         
         # If no holdings yet, show message and return
         if not self.holdings:
@@ -599,26 +932,39 @@ class ShortTradingManager:
             print("⚠️  Unable to fetch current prices. Displaying last known values.")
         
         # Display portfolio status (even with stale prices)
-        self.display_portfolio_status()
+        self.display_portfolio_status(timestamp)
         
         # Check for alerts (only if we have current prices)
         alerts = []
         if current_prices:
             alerts = self.check_alerts()
             
-            # Display alerts
-            critical_alerts = []
+            # Display alerts with a single write, like the status table
+            lines = []
             for alert in alerts:
                 if alert['type'] in ['TARGET_REACHED', 'STOP_LOSS']:
-                    critical_alerts.append(alert)
-                    print(f"\n{Fore.RED}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{Style.BRIGHT}{alert['message']}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}")
+                    lines.append(f"\n{Fore.RED}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}")
+                    lines.append(f"{Fore.RED}{Style.BRIGHT}{alert['message']}{Style.RESET_ALL}")
+                    lines.append(f"{Fore.RED}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}")
                 elif alert['type'] == 'WARNING':
-                    print(f"\n{Fore.YELLOW}{alert['message']}{Style.RESET_ALL}")
+                    lines.append(f"\n{Fore.YELLOW}{alert['message']}{Style.RESET_ALL}")
+            if lines:
+                lines.append('')
+                sys.stdout.write('\n'.join(lines))
+                sys.stdout.flush()
         
         return alerts
     
+    def stop_monitoring(self):
+        """Ask run_monitoring_loop to exit; safe to call from any thread"""
+        self._shutdown.set()
+    
+    def _handle_interrupt(self, signum, frame):
+        """SIGINT handler: first Ctrl+C ends the loop cleanly, a second aborts the current cycle"""
+        if self._shutdown.is_set():
+            raise KeyboardInterrupt
+        self._shutdown.set()
+    
     def run_monitoring_loop(self, interval: int = 60):
         """Run continuous monitoring loop"""
         print(f"\n🚀 Starting short trading monitoring...")
@@ -627,19 +973,29 @@ class ShortTradingManager:
         print(f"🛑 Stop loss: {self.max_loss_pct*100:.1f}%")
         print(f"⌨️  Press Ctrl+C to stop monitoring")
         
+        # Route Ctrl+C to the shutdown event so the interval wait ends immediately
+        self._shutdown.clear()
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGINT, self._handle_interrupt)
+        
+        iteration = 0
+        critical_alert_active = False
         try:
-            iteration = 0
-            critical_alert_active = False
+            next_cycle = time.monotonic()
             
-            while True:
+            while not self._shutdown.is_set():
                 iteration += 1
+                # Schedule against a fixed cadence so fetch latency doesn't stretch the interval
+                next_cycle += interval
                 print(f"\n{'='*50}")
                 print(f"🔄 Monitoring Cycle #{iteration}")
-                print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                timestamp = _now_str()
+                print(f"⏰ {timestamp}")
                 print(f"{'='*50}")
                 
                 # Monitor positions
-                alerts = self.monitor_positions()
+                alerts = self.monitor_positions(timestamp)
                 
                 # Handle critical alerts with blinking
                 critical_alerts = [a for a in alerts if a['type'] in ['TARGET_REACHED', 'STOP_LOSS']]
@@ -655,9 +1011,17 @@ class ShortTradingManager:
                     self.stop_blink()
                     critical_alert_active = False
                 
-                # Wait for next iteration
-                print(f"\n⏳ Next update in {interval} seconds...")
-                time.sleep(interval)
+                # Wait for next iteration; if the cycle overran, start the next one now
+                wait = next_cycle - time.monotonic()
+                if wait < 0:
+                    next_cycle = time.monotonic()
+                    wait = 0
+                print(f"\n⏳ Next update in {wait:.0f} seconds...")
+                self._shutdown.wait(wait)
+            
+            print(f"\n\n✅ Short trading monitoring stopped by user")
+            if critical_alert_active:
+                self.stop_blink()
                 
         except KeyboardInterrupt:
             print(f"\n\n✅ Short trading monitoring stopped by user")
@@ -666,4 +1030,7 @@ class ShortTradingManager:
         except Exception as e:
             print(f"\n❌ Error in monitoring loop: {e}")
             if critical_alert_active:
-                self.stop_blink()
\ No newline at end of file
+                self.stop_blink()
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
\ No newline at end of file
@@ -3,20 +3,291 @@ Stock Comparison Optimizer
 Compares two stocks using normalized metrics and weighted scoring to recommend the better investment choice.
 """
 
-import yfinance as yf
+import io
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
 import logging
 import warnings
-from typing import Dict, List, Tuple, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Optional, Any, Union
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Suppress yfinance warnings
 warnings.filterwarnings('ignore', category=FutureWarning, module='yfinance')
 warnings.filterwarnings('ignore', message='.*auto_adjust.*')
 
-from ..utils.constants import EMOJIS
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from ..utils.constants import (EMOJIS, MAX_DOWNLOAD_WORKERS, STOCK_DATA_TIMEOUT,
+                               MARKET_DATA_CACHE_DIR, STOCK_DATA_CACHE_TTL)
 from ..utils.config import format_currency, format_percentage, load_config
+from ..utils.jit import njit
+from ..utils.market_data import download_market_data, prune_cache_files
+
+# Display formats for the detailed metrics table
+FORMAT_PERCENT = 0
+FORMAT_DOLLAR = 1
+FORMAT_PLAIN = 2
+
+# Prebound formatters indexed by display format
+_VALUE_FORMATTERS = ("{:.1%}".format, "${:.2f}".format, "{:.2f}".format)
+
+# Values formatted numerically in the detailed table, including NumPy scalars
+_NUMERIC_TYPES = (int, float, np.integer, np.floating)
+
+def _display_format(metric: str) -> int:
+    """Pick the display format for a metric in the detailed comparison table"""
+    if 'ratio' in metric or 'margin' in metric or 'yield' in metric or 'growth' in metric:
+        return FORMAT_PERCENT
+    return FORMAT_DOLLAR if metric == 'eps' else FORMAT_PLAIN
+
+# Key advantage checks: the winner's value is compared against the loser's value
+# scaled by the threshold, in the direction that counts as better for the metric
+_ADVANTAGE_METRICS = ('pe_ratio', 'roe', 'revenue_growth', 'debt_to_equity', 'dividend_yield')
+_ADVANTAGE_THRESHOLDS = np.array([0.8, 1.2, 1.5, 0.7, 1.3])
+_ADVANTAGE_HIGHER_IS_BETTER = np.array([False, True, True, False, True])
+_ADVANTAGE_TEMPLATES = (
+    "Better valuation (P/E: {:.1f} vs {:.1f})",
+    "Higher profitability (ROE: {:.1%} vs {:.1%})",
+    "Stronger growth (Revenue: {:.1%} vs {:.1%})",
+    "Better financial health (D/E: {:.1f}% vs {:.1f}%)",
+    "Higher dividend income ({:.1%} vs {:.1%})"
+)
+
+def _advantage_key(values: np.ndarray) -> Tuple[Optional[float], ...]:
+    """Hashable cache key for advantage metric values; missing (NaN) values become None,
+    since NaN never compares equal and would make every lookup miss"""
+    return tuple(None if np.isnan(value) else value for value in values.tolist())
+
+@lru_cache(maxsize=1024)
+def _key_advantages(winner_values: Tuple[Optional[float], ...],
+                    loser_values: Tuple[Optional[float], ...]) -> Tuple[str, ...]:
+    """Format the winner's key advantages, memoized on the advantage metric values"""
+    winner = np.array(winner_values, dtype=np.float64)  # None back to NaN
+    loser = np.array(loser_values, dtype=np.float64)
+    
+    # A zero winner value is real data, but the loser needs a finite
+    # non-zero value for the threshold to mean anything
+    valid = np.isfinite(winner) & np.isfinite(loser) & (loser != 0)
+    scaled_loser = loser * _ADVANTAGE_THRESHOLDS
+    better = np.where(_ADVANTAGE_HIGHER_IS_BETTER, winner > scaled_loser, winner < scaled_loser)
+    
+    return tuple(_ADVANTAGE_TEMPLATES[i].format(winner[i], loser[i]) for i in np.flatnonzero(valid & better))
+
+# Directory for persisted comparison results, kept beside the market data cache
+COMPARISON_CACHE_DIR = os.path.join(MARKET_DATA_CACHE_DIR, 'comparisons')
+
+# Detailed metrics tables kept per comparator, least recently used dropped first
+DETAIL_CACHE_SIZE = 64
+
+# Normalization kinds understood by the _normalize_pair kernel
+NORM_HIGHER_IS_BETTER = 0
+NORM_LOWER_IS_BETTER = 1
+NORM_RSI = 2
+NORM_DIVIDEND_YIELD = 3
+
+# RSI is scored by distance from its neutral midpoint; dividend yields in this range score best
+_RSI_IDEAL = 50.0
+_RSI_SCALE = 1.0 / 50.0
+_DIV_LOW = 0.02
+_DIV_HIGH = 0.06
+
+# Metrics that do not use the default higher-is-better normalization
+METRIC_NORMALIZATION = {
+    'pe_ratio': NORM_LOWER_IS_BETTER, 'pb_ratio': NORM_LOWER_IS_BETTER,
+    'ps_ratio': NORM_LOWER_IS_BETTER, 'peg_ratio': NORM_LOWER_IS_BETTER,
+    'debt_to_equity': NORM_LOWER_IS_BETTER, 'beta': NORM_LOWER_IS_BETTER,
+    'volatility': NORM_LOWER_IS_BETTER, 'payout_ratio': NORM_LOWER_IS_BETTER,
+    'rsi': NORM_RSI,
+    'dividend_yield': NORM_DIVIDEND_YIELD
+}
+
+@njit(cache=True)
+def _normalize_pair(kind, val1, val2):
+    """Normalize a pair of metric values, returning the higher score for the better value"""
+    if kind == NORM_RSI:
+        # RSI: 30-70 range is ideal, penalize extremes
+        score1 = 1.0 - abs(val1 - _RSI_IDEAL) * _RSI_SCALE
+        score2 = 1.0 - abs(val2 - _RSI_IDEAL) * _RSI_SCALE
+        return max(0.0, score1), max(0.0, score2)
+    
+    if kind == NORM_DIVIDEND_YIELD:
+        # For dividend yield, moderate values are often better than extreme high
+        if val1 == 0.0 and val2 == 0.0:
+            return 0.5, 0.5
+        elif val1 == 0.0:
+            return 0.2, 0.8
+        elif val2 == 0.0:
+            return 0.8, 0.2
+        # Normalize with preference for reasonable dividend yields (2-6%)
+        score1 = 1.0 if _DIV_LOW <= val1 <= _DIV_HIGH else 0.7
+        score2 = 1.0 if _DIV_LOW <= val2 <= _DIV_HIGH else 0.7
+        if val1 > val2:
+            return min(1.0, score1 * 1.1), score2
+        return score1, min(1.0, score2 * 1.1)
+    
+    lower_is_better = kind == NORM_LOWER_IS_BETTER
+    
+    # Handle negative values specially
+    if val1 < 0.0 or val2 < 0.0:
+        if val1 < 0.0 and val2 < 0.0:
+            # Both negative - less negative is better
+            if lower_is_better:
+                return (0.3, 0.7) if val1 < val2 else (0.7, 0.3)
+            return (0.7, 0.3) if val1 > val2 else (0.3, 0.7)
+        elif val1 < 0.0:
+            return 0.2, 0.8  # Negative is bad
+        return 0.8, 0.2  # Negative is bad
+    
+    # Standard normalization for positive values
+    if val1 == val2:
+        return 0.5, 0.5
+    
+    min_val, max_val = min(val1, val2), max(val1, val2)
+    range_val = max_val - min_val
+    if range_val == 0.0:
+        return 0.5, 0.5
+    score1 = (val1 - min_val) / range_val
+    score2 = (val2 - min_val) / range_val
+    if lower_is_better:
+        # Lower value gets higher score
+        return 1.0 - score1, 1.0 - score2
+    return score1, score2
+
+@njit(cache=True)
+def _normalize_metrics_kernel(kinds, values1, values2, valid):
+    """Normalize every metric pair in one pass; invalid pairs get a neutral 0.5"""
+    n = kinds.shape[0]
+    normalized_1 = np.full(n, 0.5)
+    normalized_2 = np.full(n, 0.5)
+    for i in range(n):
+        if valid[i]:
+            score1, score2 = _normalize_pair(kinds[i], values1[i], values2[i])
+            normalized_1[i] = score1
+            normalized_2[i] = score2
+    return normalized_1, normalized_2
+
+def _first_available(info: Dict[str, Any], *keys: str) -> Any:
+    """Return the first non-None value among keys, looking each up only as needed"""
+    for key in keys:
+        value = info.get(key)
+        if value is not None:
+            return value
+    return None
+
+def _metric_values(data: Dict[str, Any], metrics: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather metric values as float64 along with a mask of usable entries"""
+    values = np.full(len(metrics), np.nan)
+    valid = np.zeros(len(metrics), dtype=np.bool_)
+    for i, metric in enumerate(metrics):
+        value = data.get(metric)
+        if value is None:
+            continue
+        try:
+            values[i] = float(value)
+            valid[i] = True
+        except (TypeError, ValueError):
+            logging.debug("Error normalizing %s: non-numeric value %r", metric, value)
+    return values, valid
+
+def _rank_normalize(values: np.ndarray, kinds: np.ndarray) -> np.ndarray:
+    """Score each column of a (stocks x metrics) matrix on a 0-1 scale from the stocks' ranks"""
+    scores = np.full(values.shape, 0.5)  # Neutral score for missing values
+    for j, kind in enumerate(kinds):
+        column = values[:, j]
+        valid = ~np.isnan(column)
+        if not valid.any():
+            continue
+        
+        # RSI and dividend yield are scored on absolute ranges, as in pairwise normalization
+        if kind == NORM_RSI:
+            scores[valid, j] = np.maximum(0.0, 1.0 - np.abs(column[valid] - _RSI_IDEAL) * _RSI_SCALE)
+            continue
+        if kind == NORM_DIVIDEND_YIELD:
+            yields = column[valid]
+            in_range = (yields >= _DIV_LOW) & (yields <= _DIV_HIGH)
+            scores[valid, j] = np.where(yields == 0, 0.2, np.where(in_range, 1.0, 0.7))
+            continue
+        
+        # A negative value is never the best outcome, even where lower is better
+        lower_is_better = kind == NORM_LOWER_IS_BETTER
+        ranked = valid & (column >= 0) if lower_is_better else valid
+        scores[valid & ~ranked, j] = 0.0
+        
+        # Dense ranks so that equal values share a score
+        unique_values, inverse = np.unique(column[ranked], return_inverse=True)
+        if unique_values.size > 1:
+            rank_scores = inverse / (unique_values.size - 1)
+            scores[ranked, j] = 1.0 - rank_scores if lower_is_better else rank_scores
+    return scores
+
+# In-memory tier of the stock data cache: (symbol, period) -> metrics dict
+_STOCK_DATA_CACHE: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+def _stock_data_cache_path(symbol: str, period: str) -> str:
+    """Build the on-disk cache path for a symbol's metrics"""
+    digest = hashlib.blake2b(f"{symbol}|{period}".encode(), digest_size=16).hexdigest()
+    return os.path.join(MARKET_DATA_CACHE_DIR, f"metrics_{digest}.pkl")
+
+def _write_pickle(path: str, obj: Any) -> None:
+    """Pickle obj to path via a temp file and atomic rename, so concurrent
+    writers and readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def _is_fresh(metrics: Dict[str, Any]) -> bool:
+    """Check whether cached metrics are younger than STOCK_DATA_CACHE_TTL"""
+    age = datetime.now() - metrics['timestamp']
+    return age.total_seconds() < STOCK_DATA_CACHE_TTL
+
+def _load_cached_stock_data(symbol: str, period: str) -> Optional[Dict[str, Any]]:
+    """Return cached metrics for a symbol if still fresh, checking memory then disk"""
+    key = (symbol, period)
+    metrics = _STOCK_DATA_CACHE.get(key)
+    if metrics is None:
+        cache_path = _stock_data_cache_path(symbol, period)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                metrics = pickle.load(f)
+        except Exception as e:
+            logging.warning("Could not read stock data cache %s: %s", cache_path, e)
+            return None
+        _STOCK_DATA_CACHE[key] = metrics
+    
+    if not _is_fresh(metrics):
+        return None
+    return dict(metrics)
+
+def _save_cached_stock_data(symbol: str, period: str, metrics: Dict[str, Any]) -> None:
+    """Store metrics in the memory and disk tiers of the stock data cache"""
+    _STOCK_DATA_CACHE[(symbol, period)] = dict(metrics)
+    cache_path = _stock_data_cache_path(symbol, period)
+    try:
+        _write_pickle(cache_path, metrics)
+    except Exception as e:
+        logging.warning("Could not write stock data cache %s: %s", cache_path, e)
 
 class StockComparator:
     """
@@ -45,9 +316,10 @@ class StockComparator:
         self.target_gain = self.config.get('target_gain_percentage', 25) / 100.0
         self.max_loss = self.config.get('maximum_loss_percentage', 5) / 100.0
         self.preferred_stocks = list(self.config.get('stocks', {}).keys())
+        self._preferred_upper = frozenset(s.upper() for s in self.preferred_stocks)
         
-        # Adjust strategy based on risk tolerance from config
-        risk_tolerance = self._determine_risk_tolerance()
+        # Adjust strategy based on risk tolerance from config (max_loss is fixed after init)
+        self._risk_tolerance = self._determine_risk_tolerance()
         
         # Define key metrics to compare
         self.metrics = {
@@ -60,6 +332,19 @@ class StockComparator:
             'momentum': ['price_momentum_3m', 'price_momentum_1y', 'rsi']
         }
         
+        # Flattened metric order shared by the normalization and scoring kernels
+        self._metric_order = [metric for metric_list in self.metrics.values() for metric in metric_list]
+        
+        # Static label columns and per-row formatter of the detailed comparison table
+        self._category_labels = {category: category.title().replace('_', ' ') for category in self.metrics}
+        self._detail_category_column = tuple(
+            self._category_labels[category] for category, metric_list in self.metrics.items() for _ in metric_list
+        )
+        self._detail_metric_column = tuple(metric.title().replace('_', ' ') for metric in self._metric_order)
+        self._detail_rows = tuple(
+            (metric, _VALUE_FORMATTERS[_display_format(metric)]) for metric in self._metric_order
+        )
+        
         # Strategy-based weights for different investment approaches
         self.strategy_weights = {
             'growth': {
@@ -86,12 +371,31 @@ class StockComparator:
         
         # Get base weights and adjust based on config
         base_weights = self.strategy_weights.get(investment_strategy, self.strategy_weights['balanced'])
-        self.weights = self._adjust_weights_for_config(base_weights, risk_tolerance)
+        self.weights = self._adjust_weights_for_config(base_weights, self._risk_tolerance)
+        
+        # Category segments of the flattened metric order, for vectorized scoring
+        self._categories = list(self.metrics.keys())
+        self._category_offsets = np.cumsum([0] + [len(self.metrics[c]) for c in self._categories[:-1]])
+        self._category_weights = np.array([self.weights.get(c, 0.0) for c in self._categories])
+        
+        # Zero-weight categories never reach the score, so skip normalizing them
+        self._active_metrics = [metric for category in self._categories if self.weights.get(category, 0) > 0
+                                for metric in self.metrics[category]]
+        self._active_kinds = np.array(
+            [METRIC_NORMALIZATION.get(metric, NORM_HIGHER_IS_BETTER) for metric in self._active_metrics],
+            dtype=np.int64
+        )
+        # Per-metric share of its category weight, for scoring many stocks at once
+        self._active_weights = np.array([self.weights[category] / len(self.metrics[category])
+                                         for category in self._categories if self.weights.get(category, 0) > 0
+                                         for _ in self.metrics[category]])
         self.comparisons = {}
+        self._detail_cache = OrderedDict()  # Bounded to DETAIL_CACHE_SIZE tables
         
-        logging.info(f"Stock comparator initialized with '{investment_strategy}' strategy")
-        logging.info(f"Config: ${self.total_investment:,.0f} investment, {self.target_gain:.0%} target gain, {self.max_loss:.0%} max loss")
-        logging.info(f"Available stocks from config: {', '.join(self.preferred_stocks) if self.preferred_stocks else 'None'}")
+        logging.info("Stock comparator initialized with '%s' strategy", investment_strategy)
+        logging.info("Config: $%s investment, %.0f%% target gain, %.0f%% max loss",
+                     format(self.total_investment, ',.0f'), self.target_gain * 100, self.max_loss * 100)
+        logging.info("Available stocks from config: %s", ', '.join(self.preferred_stocks) if self.preferred_stocks else 'None')
     
     def _determine_risk_tolerance(self) -> str:
         """
@@ -146,41 +450,57 @@ class StockComparator:
         
         return adjusted_weights
     
-    def get_stock_data(self, symbol: str, period: str = "1y") -> Dict[str, Any]:
+    def get_stock_data(self, symbol: str, period: str = "1y",
+                       history: Optional[pd.Series] = None) -> Dict[str, Any]:
         """
         Fetch comprehensive stock data for analysis
         
         Args:
             symbol: Stock symbol
             period: Data period for analysis
+            history: Close prices already downloaded for symbol, if any
             
         Returns:
             Dictionary containing all relevant metrics
         """
+        # Reuse a recent fetch; overlapping comparisons share the same symbols
+        cached = _load_cached_stock_data(symbol, period)
+        if cached is not None:
+            return cached
+        
         try:
             print(f"📊 Fetching data for {symbol}...")
             
+            # yfinance is imported on first fetch; it is slow to import and
+            # cached comparisons never need it
+            import yfinance as yf
+            
             # Get stock object and basic info
             stock = yf.Ticker(symbol)
             info = stock.info
-            hist = stock.history(period=period)
+            if history is None:
+                hist = stock.history(period=period, auto_adjust=True, timeout=STOCK_DATA_TIMEOUT)
+                history = hist['Close'] if not hist.empty else pd.Series(dtype=np.float64)
             
-            if hist.empty:
+            if history.empty:
                 raise ValueError(f"No historical data available for {symbol}")
             
+            # Work on a plain float64 view of the closes from here on
+            close = history.to_numpy(dtype=np.float64)
+            
             # Initialize metrics dictionary
             metrics = {
                 'symbol': symbol,
                 'company_name': info.get('longName', symbol),
                 'sector': info.get('sector', 'Unknown'),
-                'current_price': float(hist['Close'].iloc[-1]),
+                'current_price': float(close[-1]),
                 'market_cap': info.get('marketCap', 0),
                 'timestamp': datetime.now()
             }
             
             # Valuation metrics
             metrics.update({
-                'pe_ratio': info.get('trailingPE', info.get('forwardPE')),
+                'pe_ratio': _first_available(info, 'trailingPE', 'forwardPE'),
                 'pb_ratio': info.get('priceToBook'),
                 'ps_ratio': info.get('priceToSalesTrailing12Months'),
                 'peg_ratio': info.get('pegRatio')
@@ -191,7 +511,7 @@ class StockComparator:
                 'roe': info.get('returnOnEquity'),
                 'roa': info.get('returnOnAssets'),
                 'profit_margin': info.get('profitMargins'),
-                'eps': info.get('trailingEps', info.get('forwardEps'))
+                'eps': _first_available(info, 'trailingEps', 'forwardEps')
             })
             
             # Growth metrics
@@ -209,10 +529,13 @@ class StockComparator:
             })
             
             # Risk metrics
-            returns = hist['Close'].pct_change().dropna()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = np.diff(close) / close[:-1]
+                returns = returns[~np.isnan(returns)]
+                volatility = float(returns.std(ddof=1) * np.sqrt(252)) if returns.size > 1 else None
             metrics.update({
                 'beta': info.get('beta'),
-                'volatility': returns.std() * np.sqrt(252) if len(returns) > 1 else None
+                'volatility': volatility
             })
             
             # Dividend metrics
@@ -223,39 +546,100 @@ class StockComparator:
             
             # Momentum metrics
             current_price = metrics['current_price']
-            if len(hist) >= 63:  # 3 months of data
-                price_3m_ago = hist['Close'].iloc[-63]
+            if close.size >= 63:  # 3 months of data
+                price_3m_ago = close[-63]
                 metrics['price_momentum_3m'] = (current_price - price_3m_ago) / price_3m_ago
             else:
                 metrics['price_momentum_3m'] = None
             
-            if len(hist) >= 252:  # 1 year of data
-                price_1y_ago = hist['Close'].iloc[-252]
+            if close.size >= 252:  # 1 year of data
+                price_1y_ago = close[-252]
                 metrics['price_momentum_1y'] = (current_price - price_1y_ago) / price_1y_ago
             else:
                 metrics['price_momentum_1y'] = None
             
-            # RSI calculation
-            if len(hist) >= 15:
-                delta = hist['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                metrics['rsi'] = float(rsi.iloc[-1]) if not rsi.empty else None
+            # RSI calculation - only the latest 14-day window is needed
+            if close.size >= 15:
+                # Gains overwrite the diff buffer in place; losses follow from the net change
+                delta = np.diff(close[-15:])
+                net_change = delta.sum()
+                gain_total = np.maximum(delta, 0.0, out=delta).sum()
+                avg_gain = gain_total / 14
+                avg_loss = (gain_total - net_change) / 14
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+                metrics['rsi'] = float(rsi)
             else:
                 metrics['rsi'] = None
             
+            _save_cached_stock_data(symbol, period, metrics)
             return metrics
             
         except Exception as e:
-            logging.error(f"Error fetching data for {symbol}: {e}")
+            logging.error("Error fetching data for %s: %s", symbol, e)
             return {
                 'symbol': symbol,
                 'error': str(e),
                 'timestamp': datetime.now()
             }
     
+    def fetch_stock_data(self, symbols: List[str], period: str = "1y") -> List[Dict[str, Any]]:
+        """
+        Fetch stock data for several symbols concurrently
+        
+        Args:
+            symbols: Stock symbols to fetch
+            period: Data period for analysis
+            
+        Returns:
+            List of get_stock_data results in the same order as symbols
+        """
+        # Repeated symbols are fetched once rather than racing each other
+        unique = list(dict.fromkeys(symbols))
+        if len(unique) <= 1:
+            results = {symbol: self.get_stock_data(symbol, period) for symbol in unique}
+        else:
+            # Download histories for uncached symbols in one batch; anything the
+            # batch misses falls back to a per-ticker history request
+            missing = [s for s in unique if _load_cached_stock_data(s, period) is None]
+            histories = self._fetch_histories(missing, period) if len(missing) > 1 else {}
+            
+            # Each info fetch is network bound; failures come back as error dicts
+            with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(unique))) as executor:
+                results = dict(zip(unique, executor.map(
+                    lambda symbol: self.get_stock_data(symbol, period, histories.get(symbol)), unique
+                )))
+        
+        # Each position gets its own dict, as separate fetches would return
+        return [dict(results[symbol]) for symbol in symbols]
+    
+    def _fetch_histories(self, symbols: List[str], period: str) -> Dict[str, pd.Series]:
+        """
+        Download close prices for several symbols with a single batch request
+        
+        Returns:
+            Dictionary of symbol -> close prices, omitting symbols without data
+        """
+        try:
+            # Adjusted explicitly so batch closes match the Ticker.history fallback
+            data = download_market_data(symbols, period=period, interval='1d', auto_adjust=True)
+        except Exception as e:
+            logging.warning("Batch history download failed: %s", e)
+            return {}
+        
+        if data is None or data.empty or 'Close' not in data.columns.get_level_values(0):
+            return {}
+        
+        closes = data['Close']
+        histories = {}
+        for symbol in symbols:
+            if symbol in closes.columns:
+                # The batch frame is aligned on the union of trading days
+                history = closes[symbol].dropna()
+                if not history.empty:
+                    histories[symbol] = history
+        return histories
+    
     def _calculate_eps_growth(self, stock) -> Optional[float]:
         """Calculate EPS growth rate"""
         try:
@@ -264,130 +648,39 @@ class StockComparator:
                 return None
             
             # Get EPS data if available
-            eps_data = []
-            for col in financials.columns[:2]:  # Last 2 years
-                try:
-                    net_income = financials.loc['Net Income', col]
-                    # Basic calculation - would need shares outstanding for accurate EPS
-                    eps_data.append(net_income)
-                except (KeyError, IndexError):
-                    continue
-            
-            if len(eps_data) >= 2:
+            if 'Net Income' not in financials.index:
+                return None
+            
+            # Last 2 years - basic calculation, would need shares outstanding for accurate EPS
+            eps_data = financials.loc['Net Income'].to_numpy()[:2]
+            if eps_data.size >= 2:
                 return (eps_data[0] - eps_data[1]) / abs(eps_data[1]) if eps_data[1] != 0 else None
             
             return None
             
         except Exception as e:
-            logging.debug(f"Could not calculate EPS growth: {e}")
+            logging.debug("Could not calculate EPS growth: %s", e)
             return None
     
     def normalize_metrics(self, stock1_data: Dict[str, Any], stock2_data: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, float]]:
         """
         Normalize metrics to 0-1 scale for fair comparison
         
+        Only metrics in categories with a non-zero weight are normalized.
+        
         Returns:
             Tuple of normalized metrics for both stocks
         """
-        normalized_1 = {}
-        normalized_2 = {}
+        values1, valid1 = _metric_values(stock1_data, self._active_metrics)
+        values2, valid2 = _metric_values(stock2_data, self._active_metrics)
         
-        for category, metric_list in self.metrics.items():
-            for metric in metric_list:
-                val1 = stock1_data.get(metric)
-                val2 = stock2_data.get(metric)
-                
-                # Skip if either value is missing
-                if val1 is None or val2 is None:
-                    normalized_1[metric] = 0.5  # Neutral score
-                    normalized_2[metric] = 0.5
-                    continue
-                
-                # Handle special cases and normalization
-                norm1, norm2 = self._normalize_metric_pair(metric, val1, val2)
-                normalized_1[metric] = norm1
-                normalized_2[metric] = norm2
+        # Missing values on either side get a neutral score
+        scores1, scores2 = _normalize_metrics_kernel(self._active_kinds, values1, values2, valid1 & valid2)
         
+        normalized_1 = dict(zip(self._active_metrics, scores1.tolist()))
+        normalized_2 = dict(zip(self._active_metrics, scores2.tolist()))
         return normalized_1, normalized_2
     
-    def _normalize_metric_pair(self, metric: str, val1: float, val2: float) -> Tuple[float, float]:
-        """
-        Normalize a pair of metric values
-        
-        Returns higher score for better metric value
-        """
-        try:
-            # Metrics where lower is better
-            lower_is_better = [
-                'pe_ratio', 'pb_ratio', 'ps_ratio', 'peg_ratio',
-                'debt_to_equity', 'beta', 'volatility', 'payout_ratio'
-            ]
-            
-            # Special handling for specific metrics
-            if metric == 'rsi':
-                # RSI: 30-70 range is ideal, penalize extremes
-                ideal_rsi = 50
-                score1 = 1 - abs(val1 - ideal_rsi) / 50
-                score2 = 1 - abs(val2 - ideal_rsi) / 50
-                return max(0, score1), max(0, score2)
-            
-            elif metric in ['dividend_yield']:
-                # For dividend yield, moderate values are often better than extreme high
-                if val1 == 0 and val2 == 0:
-                    return 0.5, 0.5
-                elif val1 == 0:
-                    return 0.2, 0.8
-                elif val2 == 0:
-                    return 0.8, 0.2
-                # Normalize with preference for reasonable dividend yields (2-6%)
-                optimal_range = (0.02, 0.06)
-                score1 = 1 if optimal_range[0] <= val1 <= optimal_range[1] else 0.7
-                score2 = 1 if optimal_range[0] <= val2 <= optimal_range[1] else 0.7
-                if val1 > val2:
-                    return min(1, score1 * 1.1), score2
-                else:
-                    return score1, min(1, score2 * 1.1)
-            
-            # Handle negative values specially
-            if val1 < 0 or val2 < 0:
-                if val1 < 0 and val2 < 0:
-                    # Both negative - less negative is better
-                    if metric in lower_is_better:
-                        return (0.3, 0.7) if val1 < val2 else (0.7, 0.3)
-                    else:
-                        return (0.7, 0.3) if val1 > val2 else (0.3, 0.7)
-                elif val1 < 0:
-                    return 0.2, 0.8  # Negative is bad
-                else:
-                    return 0.8, 0.2  # Negative is bad
-            
-            # Standard normalization for positive values
-            if val1 == val2:
-                return 0.5, 0.5
-            
-            if metric in lower_is_better:
-                # Lower value gets higher score
-                min_val, max_val = min(val1, val2), max(val1, val2)
-                range_val = max_val - min_val
-                if range_val == 0:
-                    return 0.5, 0.5
-                score1 = 1 - (val1 - min_val) / range_val
-                score2 = 1 - (val2 - min_val) / range_val
-            else:
-                # Higher value gets higher score
-                min_val, max_val = min(val1, val2), max(val1, val2)
-                range_val = max_val - min_val
-                if range_val == 0:
-                    return 0.5, 0.5
-                score1 = (val1 - min_val) / range_val
-                score2 = (val2 - min_val) / range_val
-            
-            return score1, score2
-            
-        except Exception as e:
-            logging.debug(f"Error normalizing {metric}: {e}")
-            return 0.5, 0.5
-    
     def calculate_scores(self, normalized_1: Dict[str, float], normalized_2: Dict[str, float]) -> Tuple[float, float, Dict[str, Tuple[float, float]]]:
         """
         Calculate weighted scores for both stocks
@@ -395,38 +688,70 @@ class StockComparator:
         Returns:
             Tuple of (score1, score2, category_scores)
         """
-        total_score_1 = 0
-        total_score_2 = 0
-        category_scores = {}
+        n_metrics = len(self._metric_order)
+        present = np.fromiter((m in normalized_1 and m in normalized_2 for m in self._metric_order),
+                              dtype=np.bool_, count=n_metrics)
+        scores_1 = np.fromiter((normalized_1.get(m, 0.0) for m in self._metric_order), dtype=np.float64, count=n_metrics)
+        scores_2 = np.fromiter((normalized_2.get(m, 0.0) for m in self._metric_order), dtype=np.float64, count=n_metrics)
         
-        for category, weight in self.weights.items():
-            if weight == 0:
-                continue
-                
-            metrics_in_category = self.metrics[category]
-            category_score_1 = 0
-            category_score_2 = 0
-            valid_metrics = 0
-            
-            for metric in metrics_in_category:
-                if metric in normalized_1 and metric in normalized_2:
-                    category_score_1 += normalized_1[metric]
-                    category_score_2 += normalized_2[metric]
-                    valid_metrics += 1
-            
-            if valid_metrics > 0:
-                # Average the metrics in this category
-                category_score_1 /= valid_metrics
-                category_score_2 /= valid_metrics
-                
-                # Apply category weight
-                total_score_1 += category_score_1 * weight
-                total_score_2 += category_score_2 * weight
-                
-                category_scores[category] = (category_score_1, category_score_2)
+        # Average the metrics present in each category
+        valid_metrics = np.add.reduceat(present.astype(np.int64), self._category_offsets)
+        sums_1 = np.add.reduceat(np.where(present, scores_1, 0.0), self._category_offsets)
+        sums_2 = np.add.reduceat(np.where(present, scores_2, 0.0), self._category_offsets)
+        active = (valid_metrics > 0) & (self._category_weights != 0)
+        divisor = np.maximum(valid_metrics, 1)
+        category_means_1 = np.where(active, sums_1 / divisor, 0.0)
+        category_means_2 = np.where(active, sums_2 / divisor, 0.0)
+        
+        # Apply category weights
+        total_score_1 = float(category_means_1 @ self._category_weights)
+        total_score_2 = float(category_means_2 @ self._category_weights)
+        
+        category_scores = {
+            category: (float(category_means_1[i]), float(category_means_2[i]))
+            for i, category in enumerate(self._categories) if active[i]
+        }
         
         return total_score_1, total_score_2, category_scores
     
+    def _comparison_cache_key(self, symbol1: str, symbol2: str) -> str:
+        """Build the persisted comparison key; results are reused for the rest of the day"""
+        return (f"{symbol1.upper()}|{symbol2.upper()}|{self.investment_strategy}|"
+                f"{self.total_investment}|{self.target_gain}|{self.max_loss}|{date.today()}")
+    
+    def _load_comparison(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a comparison computed earlier today, checking memory then disk"""
+        if cache_key in self.comparisons:
+            return self.comparisons[cache_key]
+        
+        digest = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+        cache_path = os.path.join(COMPARISON_CACHE_DIR, f"{digest}.pkl")
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                comparison_result = pickle.load(f)
+        except Exception as e:
+            logging.warning("Could not read comparison cache %s: %s", cache_path, e)
+            return None
+        
+        self.comparisons[cache_key] = comparison_result
+        return comparison_result
+    
+    def _save_comparison(self, cache_key: str, comparison_result: Dict[str, Any]) -> None:
+        """Persist a successful comparison so later runs today can skip the fetch"""
+        self.comparisons[cache_key] = comparison_result
+        digest = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+        cache_path = os.path.join(COMPARISON_CACHE_DIR, f"{digest}.pkl")
+        try:
+            _write_pickle(cache_path, comparison_result)
+        except Exception as e:
+            logging.warning("Could not write comparison cache %s: %s", cache_path, e)
+            return
+        
+        # Keys include the date, so earlier days' results can never be read again
+        prune_cache_files(COMPARISON_CACHE_DIR, '.pkl')
+    
     def get_recommended_stocks(self, min_stocks: int = 2) -> List[str]:
         """
         Get list of stocks to compare from preferred stocks or fallback
@@ -442,18 +767,56 @@ class StockComparator:
         # First try preferred stocks from config
         if self.preferred_stocks and len(self.preferred_stocks) >= min_stocks:
             stocks = self.preferred_stocks[:10]  # Limit to first 10
-            logging.info(f"Using preferred stocks from config: {', '.join(stocks)}")
+            logging.info("Using preferred stocks from config: %s", ', '.join(stocks))
         else:
             # Fallback to default popular stocks
             fallback_stocks = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX']
             stocks = fallback_stocks[:max(min_stocks, 5)]
             if self.preferred_stocks:
-                logging.warning(f"Not enough preferred stocks ({len(self.preferred_stocks)}), using fallback: {', '.join(stocks)}")
+                logging.warning("Not enough preferred stocks (%d), using fallback: %s",
+                                len(self.preferred_stocks), ', '.join(stocks))
             else:
-                logging.info(f"No preferred stocks configured, using popular stocks: {', '.join(stocks)}")
+                logging.info("No preferred stocks configured, using popular stocks: %s", ', '.join(stocks))
         
         return stocks
     
+    def rank_stocks(self, symbols: Optional[List[str]] = None, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank several stocks in one pass instead of comparing every pair
+        
+        Each metric is scored from the stock's rank among all candidates, then
+        weighted by the strategy's category weights.
+        
+        Args:
+            symbols: Stocks to rank; defaults to get_recommended_stocks()
+            top_k: Number of best stocks to return; all of them when omitted
+            
+        Returns:
+            List of (symbol, score) tuples, best first
+        """
+        symbols = symbols or self.get_recommended_stocks()
+        stock_data = []
+        for data in self.fetch_stock_data(symbols):
+            if 'error' in data:
+                logging.warning("Skipping %s in ranking: %s", data['symbol'], data['error'])
+            else:
+                stock_data.append(data)
+        if not stock_data:
+            return []
+        
+        # (stocks x metrics) matrix with NaN for missing values
+        values = np.vstack([_metric_values(data, self._active_metrics)[0] for data in stock_data])
+        totals = _rank_normalize(values, self._active_kinds) @ self._active_weights
+        
+        n_stocks = len(stock_data)
+        k = n_stocks if top_k is None else max(0, min(top_k, n_stocks))
+        if k == 0:
+            return []
+        top = np.argpartition(-totals, k - 1)[:k] if k < n_stocks else np.arange(n_stocks)
+        top = top[np.argsort(-totals[top], kind='stable')]
+        
+        return [(stock_data[i]['symbol'].upper(), float(totals[i])) for i in top]
+    
     def _meets_investment_criteria(self, stock_data: Dict[str, Any], stock: str) -> bool:
         """
         Check if stock meets investment criteria from config
@@ -479,7 +842,7 @@ class StockComparator:
             return True
             
         except Exception as e:
-            logging.warning(f"Error checking investment criteria for {stock}: {str(e)}")
+            logging.warning("Error checking investment criteria for %s: %s", stock, e)
             return True  # Default to allow if check fails
 
     def compare_stocks(self, symbol1: str, symbol2: str) -> Dict[str, Any]:
@@ -495,12 +858,18 @@ class StockComparator:
         # Check if stocks are in preferred list (if configured)
         if self.preferred_stocks:
             for stock in [symbol1, symbol2]:
-                if stock.upper() not in [s.upper() for s in self.preferred_stocks]:
+                if stock.upper() not in self._preferred_upper:
                     print(f"{EMOJIS['warning']} {stock.upper()} not in preferred list: {', '.join(self.preferred_stocks)}")
         
+        # Reuse today's result for the same pair, strategy and config
+        cache_key = self._comparison_cache_key(symbol1, symbol2)
+        cached = self._load_comparison(cache_key)
+        if cached is not None:
+            print(f"{EMOJIS['folder']} Using comparison saved at {cached['timestamp']:%H:%M:%S}")
+            return cached
+        
         # Fetch data for both stocks
-        stock1_data = self.get_stock_data(symbol1)
-        stock2_data = self.get_stock_data(symbol2)
+        stock1_data, stock2_data = self.fetch_stock_data([symbol1, symbol2])
         
         # Check for errors
         if 'error' in stock1_data or 'error' in stock2_data:
@@ -576,7 +945,7 @@ class StockComparator:
                 'target_gain': self.target_gain,
                 'max_loss': self.max_loss,
                 'position_size': position_size,
-                'risk_tolerance': self._determine_risk_tolerance(),
+                'risk_tolerance': self._risk_tolerance,
                 'meets_criteria': {
                     'stock1': stock1_meets_criteria,
                     'stock2': stock2_meets_criteria
@@ -585,9 +954,30 @@ class StockComparator:
             'timestamp': datetime.now()
         }
         
-        self.comparisons[f"{symbol1}_{symbol2}"] = comparison_result
+        self._save_comparison(cache_key, comparison_result)
         return comparison_result
     
+    def compare_many(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Compare several stock pairs, fetching every distinct symbol only once
+        
+        Args:
+            pairs: (symbol1, symbol2) tuples to compare
+            
+        Returns:
+            Dictionary of (symbol1, symbol2) -> compare_stocks result
+        """
+        # Pairs already compared today need no data at all
+        pending = [(s1, s2) for s1, s2 in pairs
+                   if self._load_comparison(self._comparison_cache_key(s1, s2)) is None]
+        symbols = list(dict.fromkeys(symbol for pair in pending for symbol in pair))
+        
+        # One concurrent batch fetch warms the stock data cache for every pair
+        if symbols:
+            self.fetch_stock_data(symbols)
+        
+        return {(s1, s2): self.compare_stocks(s1, s2) for s1, s2 in pairs}
+    
     def print_comparison_results(self, comparison_result: Dict[str, Any]) -> None:
         """Print detailed comparison results"""
         if 'error' in comparison_result:
@@ -602,70 +992,72 @@ class StockComparator:
         category_scores = comparison_result['category_scores']
         rec = comparison_result['recommendation']
         
-        print(f"\n{EMOJIS['chart']} DETAILED COMPARISON RESULTS")
-        print("=" * 70)
+        # Collect the report and write it once so concurrent output cannot interleave
+        lines = [f"\n{EMOJIS['chart']} DETAILED COMPARISON RESULTS", "=" * 70]
         
         # Basic info
-        print(f"\n{EMOJIS['building']} Company Information:")
-        print(f"   {symbol1}: {stock1_data.get('company_name', 'N/A')} ({stock1_data.get('sector', 'Unknown')})")
-        print(f"   {symbol2}: {stock2_data.get('company_name', 'N/A')} ({stock2_data.get('sector', 'Unknown')})")
+        lines.append(f"\n{EMOJIS['building']} Company Information:")
+        lines.append(f"   {symbol1}: {stock1_data.get('company_name', 'N/A')} ({stock1_data.get('sector', 'Unknown')})")
+        lines.append(f"   {symbol2}: {stock2_data.get('company_name', 'N/A')} ({stock2_data.get('sector', 'Unknown')})")
         
         # Current prices and market caps
-        print(f"\n{EMOJIS['money_bag']} Market Data:")
-        print(f"   {symbol1}: {format_currency(stock1_data['current_price'])} | Market Cap: ${stock1_data.get('market_cap', 0)/1e9:.1f}B")
-        print(f"   {symbol2}: {format_currency(stock2_data['current_price'])} | Market Cap: ${stock2_data.get('market_cap', 0)/1e9:.1f}B")
+        lines.append(f"\n{EMOJIS['money_bag']} Market Data:")
+        lines.append(f"   {symbol1}: {format_currency(stock1_data['current_price'])} | Market Cap: ${stock1_data.get('market_cap', 0)/1e9:.1f}B")
+        lines.append(f"   {symbol2}: {format_currency(stock2_data['current_price'])} | Market Cap: ${stock2_data.get('market_cap', 0)/1e9:.1f}B")
         
         # Category scores
-        print(f"\n{EMOJIS['dart']} Category Analysis ({self.investment_strategy.title()} Strategy):")
+        lines.append(f"\n{EMOJIS['dart']} Category Analysis ({self.investment_strategy.title()} Strategy):")
         for category, (score1, score2) in category_scores.items():
             weight = self.weights[category]
             if weight > 0:
                 winner_emoji = "🥇" if score1 > score2 else "🥈" if score1 == score2 else "🥉"
                 loser_emoji = "🥉" if score1 > score2 else "🥈" if score1 == score2 else "🥇"
                 
-                print(f"   {category.title().replace('_', ' ')} (Weight: {weight:.0%}):")
-                print(f"      {winner_emoji if score1 >= score2 else loser_emoji} {symbol1}: {score1:.2f}")
-                print(f"      {loser_emoji if score1 >= score2 else winner_emoji} {symbol2}: {score2:.2f}")
+                lines.append(f"   {self._category_labels[category]} (Weight: {weight:.0%}):")
+                lines.append(f"      {winner_emoji if score1 >= score2 else loser_emoji} {symbol1}: {score1:.2f}")
+                lines.append(f"      {loser_emoji if score1 >= score2 else winner_emoji} {symbol2}: {score2:.2f}")
         
         # Final scores
-        print(f"\n{EMOJIS['trophy']} FINAL SCORES:")
-        print(f"   🎯 {symbol1}: {scores['stock1']:.3f}")
-        print(f"   🎯 {symbol2}: {scores['stock2']:.3f}")
-        print(f"   📊 Score Difference: {scores['difference']:.3f}")
+        lines.append(f"\n{EMOJIS['trophy']} FINAL SCORES:")
+        lines.append(f"   🎯 {symbol1}: {scores['stock1']:.3f}")
+        lines.append(f"   🎯 {symbol2}: {scores['stock2']:.3f}")
+        lines.append(f"   📊 Score Difference: {scores['difference']:.3f}")
         
         # Investment configuration
         if 'investment_config' in comparison_result:
             config = comparison_result['investment_config']
-            print(f"\n{EMOJIS['money_bag']} INVESTMENT CONFIGURATION:")
-            print(f"   💰 Total Investment: ${config['total_investment']:,.0f}")
-            print(f"   📈 Target Gain: {config['target_gain']:.1%}")
-            print(f"   🛡️ Max Loss Tolerance: {config['max_loss']:.1%}")
-            print(f"   ⚖️ Risk Tolerance: {config['risk_tolerance'].title()}")
-            print(f"   💵 Position Size (per stock): ${config['position_size']:,.0f}")
+            lines.append(f"\n{EMOJIS['money_bag']} INVESTMENT CONFIGURATION:")
+            lines.append(f"   💰 Total Investment: ${config['total_investment']:,.0f}")
+            lines.append(f"   📈 Target Gain: {config['target_gain']:.1%}")
+            lines.append(f"   🛡️ Max Loss Tolerance: {config['max_loss']:.1%}")
+            lines.append(f"   ⚖️ Risk Tolerance: {config['risk_tolerance'].title()}")
+            lines.append(f"   💵 Position Size (per stock): ${config['position_size']:,.0f}")
             
             # Investment criteria check
             criteria = config['meets_criteria']
-            print(f"\n{EMOJIS['checkmark']} INVESTMENT CRITERIA:")
-            print(f"   {symbol1}: {'✅ MEETS CRITERIA' if criteria['stock1'] else '❌ FAILS CRITERIA'}")
-            print(f"   {symbol2}: {'✅ MEETS CRITERIA' if criteria['stock2'] else '❌ FAILS CRITERIA'}")
+            lines.append(f"\n{EMOJIS['checkmark']} INVESTMENT CRITERIA:")
+            lines.append(f"   {symbol1}: {'✅ MEETS CRITERIA' if criteria['stock1'] else '❌ FAILS CRITERIA'}")
+            lines.append(f"   {symbol2}: {'✅ MEETS CRITERIA' if criteria['stock2'] else '❌ FAILS CRITERIA'}")
         
         # Recommendation
-        print(f"\n{EMOJIS['rocket']} RECOMMENDATION:")
+        lines.append(f"\n{EMOJIS['rocket']} RECOMMENDATION:")
         if rec['choice'] == 'NEUTRAL':
-            print(f"   🤝 Both stocks are very similar ({rec['confidence']:.0%} confidence)")
-            print(f"   💡 Consider other factors like your portfolio balance or personal preference")
+            lines.append(f"   🤝 Both stocks are very similar ({rec['confidence']:.0%} confidence)")
+            lines.append(f"   💡 Consider other factors like your portfolio balance or personal preference")
         else:
             confidence_emoji = "🔥" if rec['confidence'] > 0.8 else "✅" if rec['confidence'] > 0.7 else "⚖️"
-            print(f"   {confidence_emoji} BUY {rec['choice']} (Confidence: {rec['confidence']:.0%})")
+            lines.append(f"   {confidence_emoji} BUY {rec['choice']} (Confidence: {rec['confidence']:.0%})")
             
             winner_data = stock1_data if rec['winner'] == 1 else stock2_data
             loser_symbol = symbol2 if rec['winner'] == 1 else symbol1
             
             # Key advantages
-            print(f"   💪 Key Advantages of {rec['choice']}:")
+            lines.append(f"   💪 Key Advantages of {rec['choice']}:")
             advantages = self._identify_key_advantages(comparison_result)
             for advantage in advantages[:3]:  # Top 3 advantages
-                print(f"      • {advantage}")
+                lines.append(f"      • {advantage}")
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def _identify_key_advantages(self, comparison_result: Dict[str, Any]) -> List[str]:
         """Identify key advantages of the winning stock"""
@@ -675,83 +1067,109 @@ class StockComparator:
         if winner is None:
             return advantages
         
-        symbol1 = comparison_result['symbol1']
-        symbol2 = comparison_result['symbol2']
         stock1_data = comparison_result['stock1_data']
         stock2_data = comparison_result['stock2_data']
         
         winner_data = stock1_data if winner == 1 else stock2_data
-        winner_symbol = symbol1 if winner == 1 else symbol2
         loser_data = stock2_data if winner == 1 else stock1_data
         
-        # Check key metrics for advantages
-        if winner_data.get('pe_ratio') and loser_data.get('pe_ratio'):
-            if winner_data['pe_ratio'] < loser_data['pe_ratio'] * 0.8:
-                advantages.append(f"Better valuation (P/E: {winner_data['pe_ratio']:.1f} vs {loser_data['pe_ratio']:.1f})")
-        
-        if winner_data.get('roe') and loser_data.get('roe'):
-            if winner_data['roe'] > loser_data['roe'] * 1.2:
-                advantages.append(f"Higher profitability (ROE: {winner_data['roe']:.1%} vs {loser_data['roe']:.1%})")
-        
-        if winner_data.get('revenue_growth') and loser_data.get('revenue_growth'):
-            if winner_data['revenue_growth'] > loser_data['revenue_growth'] * 1.5:
-                advantages.append(f"Stronger growth (Revenue: {winner_data['revenue_growth']:.1%} vs {loser_data['revenue_growth']:.1%})")
-        
-        if winner_data.get('debt_to_equity') and loser_data.get('debt_to_equity'):
-            if winner_data['debt_to_equity'] < loser_data['debt_to_equity'] * 0.7:
-                advantages.append(f"Better financial health (D/E: {winner_data['debt_to_equity']:.1f}% vs {loser_data['debt_to_equity']:.1f}%)")
-        
-        if winner_data.get('dividend_yield') and loser_data.get('dividend_yield'):
-            if winner_data['dividend_yield'] > loser_data['dividend_yield'] * 1.3:
-                advantages.append(f"Higher dividend income ({winner_data['dividend_yield']:.1%} vs {loser_data['dividend_yield']:.1%})")
+        # Check all key metrics at once; repeated pairs reuse the formatted result
+        winner_values, _ = _metric_values(winner_data, _ADVANTAGE_METRICS)
+        loser_values, _ = _metric_values(loser_data, _ADVANTAGE_METRICS)
+        advantages.extend(_key_advantages(_advantage_key(winner_values), _advantage_key(loser_values)))
         
         if not advantages:
             advantages.append("More balanced overall performance across all metrics")
         
         return advantages
     
-    def get_detailed_metrics_comparison(self, comparison_result: Dict[str, Any]) -> pd.DataFrame:
+    def get_detailed_metrics_comparison(self, comparison_result: Dict[str, Any],
+                                        as_arrow: bool = False) -> Union[pd.DataFrame, 'pa.Table']:
         """
         Generate a detailed metrics comparison table
         
+        Args:
+            comparison_result: Result from compare_stocks()
+            as_arrow: Return a pyarrow Table instead of a DataFrame, for consumers
+                that only print or serialize the table
+            
+        Returns:
+            DataFrame (or pyarrow Table) with side-by-side metric comparison
+        """
+        if as_arrow and not PYARROW_AVAILABLE:
+            logging.warning("pyarrow is not installed, returning a DataFrame")
+            as_arrow = False
+        build_table = pa.table if as_arrow else pd.DataFrame
+        
+        if 'error' in comparison_result:
+            return build_table({})
+        return build_table(self._detail_columns(comparison_result))
+    
+    def get_detailed_metrics_comparison_text(self, comparison_result: Dict[str, Any]) -> str:
+        """
+        Render the detailed metrics comparison as plain text, without building a DataFrame
+        
         Returns:
-            DataFrame with side-by-side metric comparison
+            Fixed-width table with one line per metric
         """
         if 'error' in comparison_result:
-            return pd.DataFrame()
+            return ""
         
+        columns = self._detail_columns(comparison_result)
+        buffer = io.StringIO()
+        category_header, metric_header, *symbol_headers = columns
+        header = f"{category_header:<20}{metric_header:<20}" + "".join(f"{s:>12}" for s in symbol_headers)
+        print(header, file=buffer)
+        for category, metric, *values in zip(*columns.values()):
+            print(f"{category:<20}{metric:<20}" + "".join(f"{v:>12}" for v in values), file=buffer)
+        return buffer.getvalue()
+    
+    def _detail_columns(self, comparison_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build (or reuse) the column data of the detailed metrics table"""
         stock1_data = comparison_result['stock1_data']
         stock2_data = comparison_result['stock2_data']
         symbol1 = comparison_result['symbol1']
         symbol2 = comparison_result['symbol2']
         
-        comparison_data = []
+        # Each fetch is stamped, so the symbols and fetch times identify the data
+        cache_key = None
+        if stock1_data.get('timestamp') is not None and stock2_data.get('timestamp') is not None:
+            cache_key = (symbol1, symbol2, stock1_data['timestamp'], stock2_data['timestamp'])
+            cached = self._detail_cache.get(cache_key)
+            if cached is not None:
+                self._detail_cache.move_to_end(cache_key)
+                return cached
         
-        for category, metric_list in self.metrics.items():
-            for metric in metric_list:
-                val1 = stock1_data.get(metric)
-                val2 = stock2_data.get(metric)
-                
-                # Format values appropriately
-                if val1 is not None and val2 is not None:
-                    if 'ratio' in metric or 'margin' in metric or 'yield' in metric or 'growth' in metric:
-                        val1_str = f"{val1:.1%}" if isinstance(val1, (int, float)) else str(val1)
-                        val2_str = f"{val2:.1%}" if isinstance(val2, (int, float)) else str(val2)
-                    elif metric == 'eps':
-                        val1_str = f"${val1:.2f}" if isinstance(val1, (int, float)) else str(val1)
-                        val2_str = f"${val2:.2f}" if isinstance(val2, (int, float)) else str(val2)
-                    else:
-                        val1_str = f"{val1:.2f}" if isinstance(val1, (int, float)) else str(val1)
-                        val2_str = f"{val2:.2f}" if isinstance(val2, (int, float)) else str(val2)
-                else:
-                    val1_str = "N/A" if val1 is None else str(val1)
-                    val2_str = "N/A" if val2 is None else str(val2)
-                
-                comparison_data.append({
-                    'Category': category.title().replace('_', ' '),
-                    'Metric': metric.title().replace('_', ' '),
-                    symbol1: val1_str,
-                    symbol2: val2_str
-                })
-        
-        return pd.DataFrame(comparison_data)
\ No newline at end of file
+        # Label columns are fixed; only the two value columns depend on the data
+        n_rows = len(self._detail_rows)
+        values1 = [None] * n_rows
+        values2 = [None] * n_rows
+        
+        get1 = stock1_data.get
+        get2 = stock2_data.get
+        for i, (metric, format_value) in enumerate(self._detail_rows):
+            val1 = get1(metric)
+            val2 = get2(metric)
+            
+            # Format values appropriately
+            if val1 is not None and val2 is not None:
+                val1_str = format_value(val1) if isinstance(val1, _NUMERIC_TYPES) else str(val1)
+                val2_str = format_value(val2) if isinstance(val2, _NUMERIC_TYPES) else str(val2)
+            else:
+                val1_str = "N/A" if val1 is None else str(val1)
+                val2_str = "N/A" if val2 is None else str(val2)
+            
+            values1[i] = val1_str
+            values2[i] = val2_str
+        
+        columns = {
+            'Category': self._detail_category_column,
+            'Metric': self._detail_metric_column,
+            symbol1: values1,
+            symbol2: values2
+        }
+        if cache_key is not None:
+            self._detail_cache[cache_key] = columns
+            if len(self._detail_cache) > DETAIL_CACHE_SIZE:
+                self._detail_cache.popitem(last=False)
+        return columns
\ No newline at end of file
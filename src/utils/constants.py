@@ -2,6 +2,8 @@
 Constants and configuration for the investment optimizer
 """
 
+import os
+
 # Emoji constants for terminal output
 EMOJIS = {
     'fire': '🔥',
@@ -54,11 +56,19 @@ DEFAULT_STOCKS = {
 DEFAULT_PERIOD = '6mo'
 DEFAULT_INTERVAL = '1d'
 
+# Market data cache (downloads reused for this many seconds)
+MARKET_DATA_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'stock_analysis')
+MARKET_DATA_CACHE_TTL = 300
+STOCK_DATA_CACHE_TTL = 900  # Seconds a fetched comparison metrics dict stays valid
+MAX_DOWNLOAD_WORKERS = 16  # Concurrent per-ticker requests for batch downloads
+STOCK_DATA_TIMEOUT = 10  # Seconds before a single ticker history request is abandoned
+
 # Optimization parameters
 DEFAULT_TARGET_RETURN = 0.20
 DEFAULT_RISK_PER_TRADE = 0.02
 DEFAULT_ATR_MULTIPLIER = 2.0
 DEFAULT_COOLING_PERIOD_DAYS = 30
+FLOAT32_MAX_OBSERVATIONS = 2520  # ~10 years of daily returns computed in float32
 
 # File names
 CONFIG_FILE = 'investments.txt'
@@ -4,7 +4,7 @@ Helper functions for calculations and data processing
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Union
 from datetime import datetime, timedelta
 
 def calculate_atr(data: pd.DataFrame, period: int = 14) -> pd.Series:
@@ -22,8 +22,24 @@ def calculate_atr(data: pd.DataFrame, period: int = 14) -> pd.Series:
     
     return atr
 
-def calculate_returns(data: pd.DataFrame) -> pd.Series:
-    """Calculate daily returns"""
+def calculate_atr_panel(high: pd.DataFrame, low: pd.DataFrame,
+                        close: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """Calculate Average True Range (ATR) for every ticker column of aligned price panels"""
+    high_arr = high.to_numpy()
+    low_arr = low.to_numpy()
+    prev_close = close.shift().to_numpy()
+    
+    # fmax ignores the missing previous close on the first row, like DataFrame.max
+    true_range = np.fmax(high_arr - low_arr,
+                         np.fmax(np.abs(high_arr - prev_close), np.abs(low_arr - prev_close)))
+    atr = pd.DataFrame(true_range, index=close.index, columns=close.columns).rolling(window=period).mean()
+    
+    return atr
+
+def calculate_returns(data: Union[pd.DataFrame, np.ndarray]) -> Union[pd.Series, np.ndarray]:
+    """Calculate daily returns from a DataFrame with a Close column or a 1-D array of closes"""
+    if isinstance(data, np.ndarray):
+        return data[1:] / data[:-1] - 1.0
     return data['Close'].pct_change().dropna()
 
 def calculate_expected_return(returns: pd.Series, method: str = 'mean') -> float:
@@ -37,7 +53,45 @@ def calculate_expected_return(returns: pd.Series, method: str = 'mean') -> float
 
 def calculate_volatility(returns: pd.Series) -> float:
     """Calculate annualized volatility"""
-    return returns.std() * np.sqrt(252)
+    return np.std(returns, ddof=1) * np.sqrt(252)
+
+def calculate_covariance_matrix(returns: np.ndarray, volatilities: np.ndarray,
+                                min_eigenvalue: float = 1e-8) -> np.ndarray:
+    """Calculate annualized covariance matrix from a T×N returns matrix with gaps
+
+    NaN marks a missing return. Correlations are estimated pairwise over the
+    rows both tickers share, then scaled by the annualized volatilities so the
+    diagonal matches them exactly. Pairwise estimates need not be jointly
+    consistent, so eigenvalues below min_eigenvalue are lifted to keep the
+    matrix positive definite for Cholesky.
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype(returns.dtype)
+    filled = np.where(valid, returns, 0)
+    
+    # Pairwise sums over shared rows, one GEMM each; [i, j] sums ticker i's
+    # returns over the rows where ticker j also has one
+    counts = (mask.T @ mask).astype(np.float64)
+    sums = (filled.T @ mask).astype(np.float64)
+    squares = ((filled * filled).T @ mask).astype(np.float64)
+    products = (filled.T @ filled).astype(np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centered_products = products - sums * sums.T / counts
+        centered_squares = squares - sums * sums / counts
+        corr = centered_products / np.sqrt(centered_squares * centered_squares.T)
+    
+    # Pairs with too little overlap (or a flat series) are treated as uncorrelated
+    corr = np.where((counts >= 3) & np.isfinite(corr), np.clip(corr, -1.0, 1.0), 0.0)
+    np.fill_diagonal(corr, 1.0)
+    
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    if eigenvalues[0] < min_eigenvalue:
+        corr = (eigenvectors * np.maximum(eigenvalues, min_eigenvalue)) @ eigenvectors.T
+        scale = 1.0 / np.sqrt(np.diag(corr))
+        corr *= np.outer(scale, scale)  # Back to a unit diagonal
+    
+    return corr * np.outer(volatilities, volatilities)
 
 def calculate_sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.02) -> float:
     """Calculate Sharpe ratio"""
@@ -54,12 +108,15 @@ def portfolio_performance(weights: np.ndarray,
     return portfolio_return, portfolio_volatility
 
 def is_in_cooling_period(last_sold_date: datetime.date, 
-                        cooling_days: int = 30) -> bool:
-    """Check if stock is in cooling period"""
+                        cooling_days: int = 30,
+                        today: datetime.date = None) -> bool:
+    """Check if stock is in cooling period (pass today to reuse one clock read across many checks)"""
     if last_sold_date is None:
         return False
     
-    days_since_sold = (datetime.now().date() - last_sold_date).days
+    if today is None:
+        today = datetime.now().date()
+    days_since_sold = (today - last_sold_date).days
     return days_since_sold < cooling_days
 
 def format_recommendation(symbol: str, action: str, 
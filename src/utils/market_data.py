@@ -0,0 +1,114 @@
+"""
+Cached market data downloads
+"""
+
+import os
+import time
+import hashlib
+import logging
+import warnings
+from datetime import date, datetime, time as dt_time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - parquet engine for the on-disk cache tier
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .constants import MARKET_DATA_CACHE_DIR, MARKET_DATA_CACHE_TTL, MAX_DOWNLOAD_WORKERS
+
+# Suppress yfinance warnings once at import rather than around every download
+warnings.filterwarnings('ignore', module='yfinance')
+warnings.filterwarnings('ignore', message='.*auto_adjust.*')
+
+# In-memory cache tier: key -> (fetch timestamp, data)
+_DATA_CACHE: Dict[str, Tuple[float, pd.DataFrame]] = {}
+
+# Last day each cache directory was pruned, so pruning runs at most once a day
+_LAST_PRUNED: Dict[Tuple[str, str], date] = {}
+
+def prune_cache_files(directory: str, suffix: str) -> None:
+    """Delete files ending in suffix that were written before today
+
+    Cache keys include the date, so such files can never be read again.
+    """
+    today = date.today()
+    if _LAST_PRUNED.get((directory, suffix)) == today:
+        return
+    _LAST_PRUNED[(directory, suffix)] = today
+
+    cutoff = datetime.combine(today, dt_time.min).timestamp()
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith(suffix):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError as e:  # Another process may have removed it first
+                logging.debug(f"Could not prune cache file {entry.path}: {e}")
+
+def _cache_key(tickers: List[str], period: str, interval: str,
+               auto_adjust: Optional[bool] = None) -> str:
+    """Build cache key for a download request"""
+    raw = f"{sorted(tickers)}|{period}|{interval}|{date.today()}"
+    if auto_adjust is not None:
+        raw += f"|adjust={auto_adjust}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def download_market_data(tickers: List[str], period: str, interval: str,
+                         max_age: float = MARKET_DATA_CACHE_TTL,
+                         auto_adjust: Optional[bool] = None) -> pd.DataFrame:
+    """Download price data via yf.download, reusing memory and parquet caches
+
+    Cached data older than max_age seconds is refetched so that intraday
+    monitoring still sees fresh prices. auto_adjust is passed through to
+    yf.download when set; None keeps the installed yfinance's default,
+    which changed between releases.
+    """
+    key = _cache_key(tickers, period, interval, auto_adjust)
+    now = time.time()
+
+    cached = _DATA_CACHE.get(key)
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1].copy(deep=False)
+
+    cache_path = os.path.join(MARKET_DATA_CACHE_DIR, f"{key}.parquet")
+    if PYARROW_AVAILABLE and os.path.exists(cache_path):
+        fetched_at = os.path.getmtime(cache_path)
+        if now - fetched_at < max_age:
+            try:
+                data = pd.read_parquet(cache_path)
+                _DATA_CACHE[key] = (fetched_at, data)
+                return data.copy(deep=False)
+            except Exception as e:
+                logging.warning(f"Could not read market data cache {cache_path}: {e}")
+
+    # Imported here so cache hits and importers that never download skip its startup cost
+    import yfinance as yf
+    
+    # yf.download fans out one request per ticker on its own thread pool
+    kwargs = {} if auto_adjust is None else {'auto_adjust': auto_adjust}
+    data = yf.download(tickers, period=period, interval=interval, progress=False,
+                       threads=max(1, min(MAX_DOWNLOAD_WORKERS, len(tickers))), **kwargs)
+    if data is None or data.empty:
+        return data
+
+    _DATA_CACHE[key] = (now, data)
+    data = data.copy(deep=False)
+    if PYARROW_AVAILABLE:
+        try:
+            os.makedirs(MARKET_DATA_CACHE_DIR, exist_ok=True)
+            data.to_parquet(cache_path, compression='zstd')
+            prune_cache_files(MARKET_DATA_CACHE_DIR, '.parquet')
+        except Exception as e:
+            logging.warning(f"Could not write market data cache {cache_path}: {e}")
+
+    return data